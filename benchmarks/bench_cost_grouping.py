@@ -0,0 +1,87 @@
+"""Compare the legacy four-branch token type query with the single-scan unpivot.
+
+Usage:
+    python benchmarks/bench_cost_grouping.py [--days 30] [--repeat 3]
+
+Runs EXPLAIN (ANALYZE, FORMAT JSON) on both forms of the token type breakdown behind
+get_daily_cost_stats_grouped and reports execution time and how many times each one
+scans token_usage_logs and the daily rollup. Requires the same DB_* environment
+variables or secrets as the dashboard.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from db import (
+    ROLLUP_TABLE,
+    TOKEN_TYPE_COLUMNS,
+    _daily_cost_grouped_query,
+    daily_usage_source,
+    get_db_connection,
+)
+
+SCANNED_TABLES = ["token_usage_logs", ROLLUP_TABLE]
+
+
+def legacy_query(start_date):
+    """The previous token type query: one UNION ALL branch, and one source scan, per token type."""
+    source, params = daily_usage_source(start_date)
+    branches = [
+        f"""
+        SELECT date, '{category}' as category, SUM({column}) as cost, SUM(total_runs) as runs
+        FROM ({source}) AS usage
+        GROUP BY date
+        """
+        for category, column in TOKEN_TYPE_COLUMNS["cost"]
+    ]
+    return text(" UNION ALL ".join(branches) + " ORDER BY date, category"), params
+
+
+def count_scans(plan, counts=None):
+    """Count scan nodes per relation in an EXPLAIN JSON plan tree."""
+    counts = counts if counts is not None else dict.fromkeys(SCANNED_TABLES, 0)
+    relation = plan.get("Relation Name")
+    if relation in counts:
+        counts[relation] += 1
+    for child in plan.get("Plans", []):
+        count_scans(child, counts)
+    return counts
+
+
+def explain(statement, params):
+    """Return (execution ms, scan counts) for one statement."""
+    with get_db_connection().connect() as connection:
+        raw_plan = connection.execute(
+            text(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement.text}"), params
+        ).scalar()
+    plan = (json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan)[0]
+    return plan["Execution Time"], count_scans(plan["Plan"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=None, help="Window size in days (default: all time)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query; best run is reported")
+    args = parser.parse_args()
+
+    start_date = datetime.now() - timedelta(days=args.days) if args.days else None
+    queries = {
+        "legacy": legacy_query(start_date),
+        "single-scan": _daily_cost_grouped_query(start_date, group_by="token_type"),
+    }
+    header = "".join(f" {table[:24]:>24}" for table in SCANNED_TABLES)
+    print(f"{'query':<12} {'best ms':>9}{header}")
+    for name, (statement, params) in queries.items():
+        runs = [explain(statement, params) for _ in range(args.repeat)]
+        elapsed, counts = min(runs, key=lambda run: run[0])
+        scans = "".join(f" {counts[table]:>24}" for table in SCANNED_TABLES)
+        print(f"{name:<12} {elapsed:>9.1f}{scans}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare exact and sketch-based unique author counts on llm_tweets.
+
+Usage:
+    python benchmarks/bench_distinct_authors.py [--windows 7 30 90 0] [--repeat 3]
+
+For each window (in days; 0 means all time) reports the exact COUNT(DISTINCT author),
+the estimate merged from the daily author sketches, the relative error and the best
+wall time of each. Run `python rollups.py` first so the sketches exist. Requires the
+same DB_* environment variables or secrets as the dashboard.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import approximate_unique_authors, build_query, read_query
+
+
+def exact_unique_authors(start_date):
+    statement, params = build_query(
+        "SELECT COUNT(DISTINCT author) AS unique_authors FROM llm_tweets", start_date, time_column="tweet_timestamp"
+    )
+    return int(read_query(statement, params)["unique_authors"].iloc[0])
+
+
+def best_of(repeat, func, *args):
+    """Return (result, best seconds) over repeat runs."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - started)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", type=int, nargs="+", default=[7, 30, 90, 0], help="Window sizes in days (0 = all time)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per method; best run is reported")
+    args = parser.parse_args()
+
+    print(f"{'window':<9} {'exact':>10} {'approx':>10} {'error':>8} {'exact s':>9} {'approx s':>9}")
+    for days in args.windows:
+        start_date = datetime.now() - timedelta(days=days) if days else None
+        exact, exact_s = best_of(args.repeat, exact_unique_authors, start_date)
+        approx, approx_s = best_of(args.repeat, approximate_unique_authors, start_date)
+        label = f"{days}d" if days else "all"
+        if approx is None:
+            print(f"{label:<9} {exact:>10,} {'n/a':>10} {'':>8} {exact_s:>9.3f} {'':>9}  (no sketched days in window)")
+            continue
+        error = (approx - exact) / exact if exact else 0.0
+        print(f"{label:<9} {exact:>10,} {approx:>10,} {error:>8.2%} {exact_s:>9.3f} {approx_s:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare the read_sql and COPY fetch engines in db.py on the bulk log loaders.
+
+Usage:
+    python benchmarks/bench_fetch_engines.py [--days 30] [--repeat 3]
+
+Reports wall time, rows/sec and peak Python heap (tracemalloc) per table and engine.
+Requires the same DB_* environment variables or secrets as the dashboard.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import FETCH_ENGINES, build_query, read_query
+
+TABLES = ["token_usage_logs", "visit_logs"]
+
+
+def run_once(table, start_date, fetch_engine):
+    """Fetch one window and return (rows, seconds, peak bytes, frame bytes)."""
+    statement, params = build_query(f"SELECT * FROM {table}", start_date, suffix="ORDER BY tstp DESC")
+    tracemalloc.start()
+    started = time.perf_counter()
+    frame = read_query(statement, params, fetch_engine=fetch_engine)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(frame), elapsed, peak, frame.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=None, help="Window size in days (default: all time)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per table and engine; best run is reported")
+    args = parser.parse_args()
+
+    start_date = datetime.now() - timedelta(days=args.days) if args.days else None
+    print(f"{'table':<18} {'engine':<9} {'rows':>10} {'best s':>8} {'rows/s':>12} {'peak MB':>9} {'frame MB':>9}")
+    for table in TABLES:
+        for fetch_engine in FETCH_ENGINES:
+            runs = [run_once(table, start_date, fetch_engine) for _ in range(args.repeat)]
+            rows, elapsed, peak, frame_bytes = min(runs, key=lambda run: run[1])
+            rate = rows / elapsed if elapsed else 0
+            print(
+                f"{table:<18} {fetch_engine:<9} {rows:>10,} {elapsed:>8.2f} {rate:>12,.0f} "
+                f"{peak / 1e6:>9.1f} {frame_bytes / 1e6:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare the per-row insight scan with the bisect prefix index behind load_tweet_analytics.
+
+Usage:
+    python benchmarks/bench_insight_matching.py [--tweets 10000] [--insights 10000] [--sample 200]
+
+Builds synthetic insights and truncated "Insight from ..." thread starts, matches them
+with data.find_best_match using a prebuilt index, and times the previous
+iterrows()-based scan on a sample of the tweets (it is quadratic, so the full run is
+extrapolated). Both matchers must agree on the sample. Runs no queries, but
+importing data.py needs the same DB_* environment variables or secrets as the dashboard.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from data import build_insight_prefix_index, clean_text_for_matching, find_best_match
+
+WORDS = ["model", "attention", "tokens", "reasoning", "benchmark", "sparse", "agents",
+         "retrieval", "scaling", "alignment", "context", "latency", "training", "data"]
+
+
+def synthetic_insights(count, seed):
+    """Insights with a shared 'Insight from' preamble, like the stored reviews."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 60)))
+        rows.append({
+            "tweet_insight": f"Insight from Paper {i} (Jan {rng.randint(1, 28)}, 2025)\n\n{body}",
+            "arxiv_code": f"2501.{i:05d}",
+            "tweet_type": "insight_v5",
+        })
+    return pd.DataFrame(rows)
+
+
+def synthetic_tweets(insights, count, seed):
+    """Thread starts truncated at a random point, with a t.co link appended."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        insight = insights["tweet_insight"].iloc[rng.randrange(len(insights))]
+        cut = rng.randint(len(insight) // 2, len(insight))
+        texts.append(f"{insight[:cut]} https://t.co/{rng.randrange(10**8):08d}")
+    return texts
+
+
+def legacy_find_best_match(analytics_text, insights_df):
+    """The previous matcher: re-clean every insight for every tweet."""
+    analytics_text = clean_text_for_matching(analytics_text)
+    for _, row in insights_df.iterrows():
+        if clean_text_for_matching(row["tweet_insight"]).startswith(analytics_text):
+            return row
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=10_000, help="Thread starts to match (default: 10000)")
+    parser.add_argument("--insights", type=int, default=10_000, help="Insights to match against (default: 10000)")
+    parser.add_argument("--sample", type=int, default=200, help="Tweets timed with the legacy scan (default: 200)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    insights = synthetic_insights(args.insights, args.seed)
+    tweets = synthetic_tweets(insights, args.tweets, args.seed + 1)
+
+    started = time.perf_counter()
+    index = build_insight_prefix_index(insights)
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    indexed = [find_best_match(text, insights, index) for text in tweets]
+    lookup_s = time.perf_counter() - started
+
+    sample = tweets[:args.sample]
+    started = time.perf_counter()
+    legacy = [legacy_find_best_match(text, insights) for text in sample]
+    legacy_s = (time.perf_counter() - started) * len(tweets) / max(len(sample), 1)
+
+    mismatches = sum(
+        (old is None) != (new is None) or (old is not None and old.name != new.name)
+        for old, new in zip(legacy, indexed)
+    )
+    matched = sum(match is not None for match in indexed)
+    print(f"{args.tweets:,} tweets x {args.insights:,} insights, {matched:,} matched")
+    print(f"{'legacy scan':<14} {legacy_s:>10.2f} s  (extrapolated from {len(sample):,} tweets)")
+    print(f"{'prefix index':<14} {build_s + lookup_s:>10.2f} s  (build {build_s:.2f} s, lookups {lookup_s:.2f} s)")
+    print(f"speedup {legacy_s / (build_s + lookup_s):,.0f}x, {mismatches} mismatches on the sample")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare the per-row role tagging loop with the vectorized masks in process_account_analytics.
+
+Usage:
+    python benchmarks/bench_role_tagging.py [--tweets 500000] [--sample 20000]
+
+Builds a synthetic analytics export with thread starts, link tweets, discussion tweets
+and filler, tags it with tag_tweet_roles, and times the previous iterrows() loop with
+per-row df.loc writes on a sample (extrapolated to the full export). Both must tag the
+sample identically; the synthetic texts are plain ASCII, which normalization leaves
+matching the same way. Needs no database.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from process_account_analytics import tag_tweet_roles
+
+ROLE_COLUMNS = ["is_thread_start", "is_link_tweet", "is_discussion_tweet"]
+
+TEMPLATES = [
+    "Insight from {title} (Dec {day}, 2024)\n\nThe authors show that {body}",
+    "arXiv link: https://arxiv.org/abs/2412.{code}\n\nLLMpedia link: https://llmpedia.ai/?arxiv_code=2412.{code}",
+    "Related discussion: https://x.com/someone/status/{code}",
+    "repo: https://github.com/org/project-{code}",
+    "{body}",
+    None,
+]
+
+
+def synthetic_export(count, seed):
+    rng = random.Random(seed)
+    words = ["model", "attention", "tokens", "reasoning", "benchmark", "sparse", "agents", "scaling"]
+    texts = []
+    for _ in range(count):
+        template = rng.choice(TEMPLATES)
+        if template is None:
+            texts.append(None)
+            continue
+        texts.append(template.format(
+            title=" ".join(rng.choice(words).title() for _ in range(4)),
+            day=rng.randint(1, 31),
+            body=" ".join(rng.choice(words) for _ in range(rng.randint(20, 40))),
+            code=f"{rng.randrange(10**5):05d}",
+        ))
+    return pd.DataFrame({"Post id": range(count), "Post text": texts})
+
+
+def legacy_tag_tweet_roles(df):
+    """The previous loop from identify_threads."""
+    df["is_thread_start"] = False
+    df["is_link_tweet"] = False
+    df["is_discussion_tweet"] = False
+    date_pattern = r"\([A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}\)"
+    for i, row in df.iterrows():
+        text = str(row["Post text"]) if pd.notna(row["Post text"]) else ""
+        if re.search(date_pattern, text):
+            df.loc[i, "is_thread_start"] = True
+        if "arxiv link:" in text.lower() and "llmpedia link:" in text.lower():
+            df.loc[i, "is_link_tweet"] = True
+        if "related discussion:" in text.lower() or "repo:" in text.lower():
+            df.loc[i, "is_discussion_tweet"] = True
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tweets", type=int, default=500_000, help="Synthetic export size (default: 500000)")
+    parser.add_argument("--sample", type=int, default=20_000, help="Tweets tagged with the legacy loop (default: 20000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    export = synthetic_export(args.tweets, args.seed)
+
+    started = time.perf_counter()
+    vectorized = tag_tweet_roles(export.copy())
+    vectorized_s = time.perf_counter() - started
+
+    sample = export.head(args.sample).copy()
+    started = time.perf_counter()
+    legacy = legacy_tag_tweet_roles(sample)
+    legacy_s = (time.perf_counter() - started) * len(export) / max(len(sample), 1)
+
+    mismatches = int((legacy[ROLE_COLUMNS] != vectorized.head(len(legacy))[ROLE_COLUMNS]).any(axis=1).sum())
+    counts = ", ".join(f"{column} {int(vectorized[column].sum()):,}" for column in ROLE_COLUMNS)
+    print(f"{len(export):,} tweets: {counts}")
+    print(f"{'iterrows loop':<14} {legacy_s:>9.2f} s  (extrapolated from {len(sample):,} tweets)")
+    print(f"{'vectorized':<14} {vectorized_s:>9.2f} s")
+    print(f"speedup {legacy_s / vectorized_s:,.0f}x, {mismatches} mismatches on the sample")
+
+
+if __name__ == "__main__":
+    main()
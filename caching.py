@@ -0,0 +1,154 @@
+import functools
+import inspect
+import threading
+from datetime import datetime, timedelta
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import instrumentation
+
+# Bucket size used to align a time window, by maximum window span
+WINDOW_BUCKETS = [
+    (timedelta(days=1), timedelta(minutes=5)),
+    (timedelta(days=7), timedelta(minutes=15)),
+    (timedelta(days=31), timedelta(hours=1)),
+]
+DEFAULT_BUCKET = timedelta(days=1)
+
+_cache_stats = {}
+_cache_stats_lock = threading.Lock()
+
+# Session state key for the oldest data timestamp of the current run
+AS_OF_KEY = "_data_as_of"
+_as_of_lock = threading.Lock()
+
+def get_bucket_size(start_date=None, end_date=None, now=None):
+    """Return the alignment bucket for a window based on its span."""
+    if not isinstance(start_date, datetime):
+        return DEFAULT_BUCKET
+    if not isinstance(end_date, datetime):
+        end_date = now or datetime.now(start_date.tzinfo)
+    span = end_date - start_date
+    for max_span, bucket in WINDOW_BUCKETS:
+        if span <= max_span:
+            return bucket
+    return DEFAULT_BUCKET
+
+def floor_to_bucket(ts, bucket):
+    """Round a timestamp down to a bucket boundary."""
+    epoch = datetime(1970, 1, 1, tzinfo=ts.tzinfo)
+    return ts - (ts - epoch) % bucket
+
+def ceil_to_bucket(ts, bucket):
+    """Round a timestamp up to a bucket boundary."""
+    floored = floor_to_bucket(ts, bucket)
+    return floored if floored == ts else floored + bucket
+
+def canonical_window(start_date=None, end_date=None, now=None):
+    """
+    Align a time window to bucket boundaries so equivalent windows compare equal.
+
+    The start is rounded down and the end rounded up, so the aligned window always
+    covers the requested one. Windows up to a day use 5-minute buckets, up to a week
+    15 minutes, up to a month one hour, and anything longer whole days.
+
+    Returns:
+        tuple: (start_date, end_date) with None bounds passed through unchanged
+    """
+    bucket = get_bucket_size(start_date, end_date, now)
+    if isinstance(start_date, datetime):
+        start_date = floor_to_bucket(start_date, bucket)
+    if isinstance(end_date, datetime):
+        end_date = ceil_to_bucket(end_date, bucket)
+    return start_date, end_date
+
+def _record(name, counter):
+    with _cache_stats_lock:
+        stats = _cache_stats.setdefault(name, {"calls": 0, "misses": 0})
+        stats[counter] += 1
+
+def _note_as_of(as_of):
+    """Track the oldest data timestamp used by the current script run (see get_data_as_of)."""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return
+    with _as_of_lock:
+        current = st.session_state.get(AS_OF_KEY)
+        if current is None or as_of < current:
+            st.session_state[AS_OF_KEY] = as_of
+
+def reset_data_as_of():
+    """Start tracking data age afresh; called at the top of each page run."""
+    st.session_state.pop(AS_OF_KEY, None)
+
+def get_data_as_of():
+    """Return when the oldest data shown in this run was read or last confirmed unchanged, or None."""
+    return st.session_state.get(AS_OF_KEY)
+
+# Entries kept per probed loader by default; each change of the probe token adds an entry
+# and the superseded ones are only reclaimed by this bound (or the ttl)
+PROBED_MAX_ENTRIES = 16
+
+def cached_loader(ttl=3600, probe=None, max_entries=None):
+    """
+    Cache a data loader with st.cache_data, count its hits and misses, and record
+    each call with instrumentation.track.
+
+    `start_date` / `end_date` arguments are aligned with canonical_window before the
+    cache key is computed, so reruns and sessions asking for the same window share
+    one cache entry.
+
+    `probe`, if given, is called with the bound arguments and returns a cheap token for
+    the state of the loader's source tables (see db.table_probe). The token is part of
+    the cache key, so the loader re-runs only once its data changed, and `ttl` just
+    bounds how long an unchanged result is kept. Superseded entries stay cached, so
+    probed loaders keep at most `max_entries` (default PROBED_MAX_ENTRIES) results,
+    evicting the least recently used.
+    """
+    def decorator(func):
+        name = func.__name__
+        signature = inspect.signature(func)
+        has_window = "start_date" in signature.parameters or "end_date" in signature.parameters
+
+        @functools.wraps(func)
+        def compute(*args, data_version=None, **kwargs):
+            _record(name, "misses")
+            instrumentation.mark_miss()
+            return datetime.now(), func(*args, **kwargs)
+
+        if max_entries is None and probe is not None:
+            entries = PROBED_MAX_ENTRIES
+        else:
+            entries = max_entries
+        cached = st.cache_data(ttl=ttl, max_entries=entries)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            if has_window:
+                start_date, end_date = canonical_window(
+                    bound.arguments.get("start_date"), bound.arguments.get("end_date")
+                )
+                if "start_date" in bound.arguments:
+                    bound.arguments["start_date"] = start_date
+                if "end_date" in bound.arguments:
+                    bound.arguments["end_date"] = end_date
+            # The probe is a cached loader itself and notes when it last checked the tables
+            data_version = probe(bound.arguments) if probe else None
+            _record(name, "calls")
+            with instrumentation.track(name, cache="hit") as call:
+                computed_at, call["result"] = cached(*bound.args, data_version=data_version, **bound.kwargs)
+            if probe is None:
+                _note_as_of(computed_at)
+            return call["result"]
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+def get_cache_stats():
+    """Return per-loader cache calls, hits and misses since the process started."""
+    with _cache_stats_lock:
+        snapshot = {name: dict(stats) for name, stats in _cache_stats.items()}
+    for stats in snapshot.values():
+        stats["hits"] = max(stats["calls"] - stats["misses"], 0)
+        stats["hit_rate"] = stats["hits"] / stats["calls"] if stats["calls"] else 0.0
+    return snapshot
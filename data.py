@@ -1,74 +1,219 @@
+import bisect
+import hashlib
 import os
+import sqlite3
+import threading
+from contextlib import closing
+import numpy as np
 import pandas as pd
-import streamlit as st
-from sqlalchemy import create_engine
 from datetime import datetime
-from thefuzz import fuzz
-import re
+from rapidfuzz import fuzz, process
+from db import build_query, read_query, table_probe
+from caching import cached_loader
+from dtypes import compact_frame
+from text_cleaning import clean_text, normalize_text_column
 
-@st.cache_data(ttl=3600)
+# Sorts after any character, so keys starting with a prefix p all fall in [p, p + _MAX_CHAR]
+_MAX_CHAR = chr(0x10FFFF)
 
-def get_database_url():
-    """Get database URL from environment variables or streamlit secrets."""
-    try:
-        db_params = {
-            "dbname": os.environ["DB_NAME"],
-            "user": os.environ["DB_USER"],
-            "password": os.environ["DB_PASS"],
-            "host": os.environ["DB_HOST"],
-            "port": os.environ["DB_PORT"],
-        }
-    except:
-        db_params = {**st.secrets["postgres"]}
-    
-    return f"postgresql+psycopg2://{db_params['user']}:{db_params['password']}@{db_params['host']}:{db_params['port']}/{db_params['dbname']}"
+# Persisted Post id -> insight matches, so only new thread starts go through matching
+MATCH_CACHE_PATH = os.environ.get("TWEET_MATCH_CACHE", "data/tweet_matches.sqlite")
+# Bump when matching logic changes so stored matches are recomputed
+MATCHER_VERSION = 3
+MATCH_COLUMNS = ['tweet_insight', 'arxiv_code', 'tweet_type']
+
+# Fuzzy fallback: minimum partial_ratio score, and how far (in days) a tweet's Date may
+# be from the review's tstp for the review to be a candidate
+FUZZY_MIN_SCORE = 90
+FUZZY_WINDOW_DAYS = 3
+# Shorter cleaned texts would partially match almost any insight
+FUZZY_MIN_LENGTH = 40
+
+_match_cache_lock = threading.Lock()
 
 def clean_text_for_matching(text):
-    """Clean text to improve matching accuracy."""
-    # Remove line breaks and extra spaces
-    text = re.sub(r'\s+', ' ', text.strip())
-    # Remove t.co URLs and any trailing text after them
-    text = re.sub(r'https://t\.co/\w+.*$', '', text)
-    # Remove other URLs
-    text = re.sub(r'https?://\S+', '', text)
-    return text.strip()
-
-def find_best_match(analytics_text, insights_df):
-    """Find exact match up to truncation point."""
-    analytics_text = clean_text_for_matching(analytics_text)
-    matches = []
+    """Clean text to improve matching accuracy (see text_cleaning.clean_text)."""
+    return clean_text(text)
+
+def build_insight_prefix_index(insights_df):
+    """
+    Index cleaned insight texts for prefix lookups with bisect.
+
+    Returns:
+        tuple: (cleaned texts in sorted order, row position in insights_df of each)
+    """
+    if 'tweet_insight_normalized' in insights_df.columns:
+        cleaned = insights_df['tweet_insight_normalized'].tolist()
+    else:
+        cleaned = normalize_text_column(insights_df['tweet_insight']).tolist()
+    positions = sorted(range(len(cleaned)), key=cleaned.__getitem__)
+    return [cleaned[position] for position in positions], positions
+
+def find_best_match(analytics_text, insights_df, index=None):
+    """
+    Find exact match up to truncation point.
+
+    Returns the first insight (in insights_df order) whose cleaned text starts with the
+    cleaned analytics text, which might be truncated. Texts sharing a prefix are
+    adjacent once sorted, so with an index from build_insight_prefix_index each lookup
+    is two bisections; pass one index when matching many texts against the same frame.
+    """
+    if index is None:
+        index = build_insight_prefix_index(insights_df)
+    position = _prefix_lookup(index, clean_text_for_matching(analytics_text))
+    return None if position is None else insights_df.iloc[position]
+
+def _prefix_lookup(index, cleaned_text):
+    """Return the first row position whose indexed text starts with cleaned_text, or None."""
+    keys, positions = index
+    first = bisect.bisect_left(keys, cleaned_text)
+    last = bisect.bisect_right(keys, cleaned_text + _MAX_CHAR, lo=first)
+    if first == last:
+        return None
+    return min(positions[first:last])
+
+def _naive_timestamps(values):
+    timestamps = pd.to_datetime(pd.Series(values))
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    return timestamps
+
+def fuzzy_match_insights(texts, dates, insights_df, cleaned_insights):
+    """
+    Second-pass matcher for thread starts with no exact prefix match (edited text, emoji, ...).
+
+    Each tweet is only compared with insights reviewed within FUZZY_WINDOW_DAYS of its
+    Date, and all tweets of one day are scored against their candidates in a single
+    rapidfuzz cdist call spread over all cores.
+
+    Args:
+        texts: Cleaned tweet texts
+        dates: Tweet dates, aligned with texts
+        insights_df: Insights with their tstp column
+        cleaned_insights: Cleaned insight texts in insights_df row order
+
+    Returns:
+        list: Row position in insights_df of each text's best match, or None if no
+        candidate scores at least FUZZY_MIN_SCORE
+    """
+    results = [None] * len(texts)
+    if not texts or insights_df.empty:
+        return results
     
-    for _, row in insights_df.iterrows():
-        insight_text = clean_text_for_matching(row['tweet_insight'])
-        # Check if analytics text (which might be truncated) matches the start of the insight text
-        if insight_text.startswith(analytics_text):
-            matches.append(row)
+    insight_dates = _naive_timestamps(insights_df['tstp']).to_numpy()
+    order = np.argsort(insight_dates, kind='stable')
+    sorted_dates = insight_dates[order]
+    window = pd.Timedelta(days=FUZZY_WINDOW_DAYS)
     
-    return matches[0] if matches else None
-
-@st.cache_data(ttl=3600)
+    tweet_days = _naive_timestamps(dates).dt.normalize()
+    long_enough = pd.Series([len(text) >= FUZZY_MIN_LENGTH for text in texts])
+    for day, rows in tweet_days[long_enough].groupby(tweet_days[long_enough]).groups.items():
+        first = np.searchsorted(sorted_dates, (day - window).to_datetime64(), side='left')
+        last = np.searchsorted(sorted_dates, (day + window + pd.Timedelta(days=1)).to_datetime64(), side='left')
+        candidates = order[first:last]
+        if not len(candidates):
+            continue
+        scores = process.cdist(
+            [texts[row] for row in rows],
+            [cleaned_insights[candidate] for candidate in candidates],
+            scorer=fuzz.partial_ratio,
+            score_cutoff=FUZZY_MIN_SCORE,
+            workers=-1,
+        )
+        best = scores.argmax(axis=1)
+        for row, column, score in zip(rows, best, scores[np.arange(len(rows)), best]):
+            if score >= FUZZY_MIN_SCORE:
+                results[row] = int(candidates[column])
+    return results
 
+@cached_loader(ttl=3600, probe=table_probe("tweet_reviews"))
 def load_tweet_insights(arxiv_code: str = None, drop_rejected: bool = False):
     """Load tweet insights from database."""
-    query = "SELECT * FROM tweet_reviews"
-    if arxiv_code:
-        query += f" AND arxiv_code = '{arxiv_code}';"
-    query += " ORDER BY tstp DESC;"
-    
-    conn = create_engine(get_database_url())
-    tweet_reviews_df = pd.read_sql(query, conn)
+    conditions = ["arxiv_code = :arxiv_code"] if arxiv_code else []
+    statement, params = build_query(
+        "SELECT * FROM tweet_reviews",
+        conditions=conditions,
+        suffix="ORDER BY tstp DESC",
+        params={"arxiv_code": arxiv_code} if arxiv_code else None,
+    )
+    tweet_reviews_df = read_query(statement, params)
     
     if drop_rejected:
         tweet_reviews_df = tweet_reviews_df[tweet_reviews_df["rejected"] == False]
     
     tweet_reviews_df.sort_values(by="tstp", ascending=False, inplace=True)
-    tweet_reviews_df.drop(columns=["tstp", "rejected"], inplace=True)
+    # tstp is kept for the fuzzy matcher's date blocking
+    tweet_reviews_df.drop(columns=["rejected"], inplace=True)
     tweet_reviews_df.rename(columns={"review": "tweet_insight"}, inplace=True)
+    # Normalized once here and cached with the frame for every matcher
+    tweet_reviews_df["tweet_insight_normalized"] = normalize_text_column(tweet_reviews_df["tweet_insight"]).values
     
     return tweet_reviews_df
 
-@st.cache_data(ttl=3600)
+def insights_fingerprint(insights_df):
+    """Identify the insight set (and matcher version) a stored match was computed against."""
+    hashed = pd.util.hash_pandas_object(insights_df[MATCH_COLUMNS + ['tstp']], index=False)
+    digest = hashlib.blake2b(hashed.values.tobytes(), digest_size=16).hexdigest()
+    return f"v{MATCHER_VERSION}:{len(insights_df)}:{digest}"
+
+def _connect_match_cache():
+    """Open the match store; callers close it (using the connection as a context manager only commits)."""
+    connection = sqlite3.connect(MATCH_CACHE_PATH, timeout=10)
+    try:
+        connection.execute("CREATE TABLE IF NOT EXISTS match_cache_meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS tweet_matches "
+            "(post_id TEXT PRIMARY KEY, tweet_insight TEXT, arxiv_code TEXT, tweet_type TEXT)"
+        )
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
 
+def load_match_cache(fingerprint):
+    """
+    Return stored matches (None columns for thread starts with no match) indexed by Post id.
+
+    Matches computed against other insights or another matcher version are discarded.
+    """
+    empty = pd.DataFrame(columns=MATCH_COLUMNS, index=pd.Index([], name='post_id'))
+    with _match_cache_lock:
+        try:
+            with closing(_connect_match_cache()) as connection, connection:
+                stored = connection.execute(
+                    "SELECT value FROM match_cache_meta WHERE key = 'fingerprint'"
+                ).fetchone()
+                if stored is None or stored[0] != fingerprint:
+                    connection.execute("DELETE FROM tweet_matches")
+                    connection.execute(
+                        "INSERT OR REPLACE INTO match_cache_meta (key, value) VALUES ('fingerprint', ?)",
+                        (fingerprint,),
+                    )
+                    return empty
+                return pd.read_sql("SELECT * FROM tweet_matches", connection, index_col='post_id')
+        except (sqlite3.Error, OSError) as e:
+            # Matching still works without the store, just without reuse
+            print(f"Error reading tweet match cache: {e}")
+            return empty
+
+def save_match_cache(fingerprint, matches):
+    """Store new matches (a DataFrame of MATCH_COLUMNS indexed by Post id) if the fingerprint still applies."""
+    with _match_cache_lock:
+        try:
+            with closing(_connect_match_cache()) as connection, connection:
+                stored = connection.execute(
+                    "SELECT value FROM match_cache_meta WHERE key = 'fingerprint'"
+                ).fetchone()
+                if stored is None or stored[0] != fingerprint:
+                    return
+                connection.executemany(
+                    "INSERT OR REPLACE INTO tweet_matches (post_id, tweet_insight, arxiv_code, tweet_type) VALUES (?, ?, ?, ?)",
+                    [(post_id, *values) for post_id, values in zip(matches.index, matches[MATCH_COLUMNS].itertuples(index=False))],
+                )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error writing tweet match cache: {e}")
+
+@cached_loader(ttl=3600, probe=table_probe("tweet_reviews"))
 def load_tweet_analytics():
     """Load and combine tweet analytics with insights."""
     # Load analytics data
@@ -78,6 +223,9 @@ def load_tweet_analytics():
     # Now load insights for additional metadata
     insights_df = load_tweet_insights(drop_rejected=True)
     
+    # Normalized once per load and cached with the frame (bold titles folded, links stripped)
+    analytics_df['post_text_normalized'] = normalize_text_column(analytics_df['Post text']).values
+    
     # Initialize metadata columns
     analytics_df['tweet_insight'] = None
     analytics_df['arxiv_code'] = None
@@ -86,21 +234,52 @@ def load_tweet_analytics():
     # Match thread start tweets with insights
     # Thread starts are tweets that contain "Insight from"
     thread_starts = analytics_df[
-        analytics_df['Post text'].str.contains(
+        analytics_df['post_text_normalized'].str.contains(
             r'Insight from .+?\([A-Za-z]+ \d{1,2}, \d{4}\)',
             regex=True,
             na=False
         )
     ].copy()
     
-    for idx, row in thread_starts.iterrows():
-        best_match = find_best_match(row['Post text'], insights_df)
-        if best_match is not None:
-            analytics_df.loc[idx, 'tweet_insight'] = best_match['tweet_insight']
-            analytics_df.loc[idx, 'arxiv_code'] = best_match['arxiv_code']
-            analytics_df.loc[idx, 'tweet_type'] = best_match['tweet_type']
+    # Reuse matches stored for these insights; only new thread starts are matched
+    fingerprint = insights_fingerprint(insights_df)
+    matches = load_match_cache(fingerprint)
+    post_ids = thread_starts['Post id'].astype(str)
+    new_starts = thread_starts[~post_ids.isin(matches.index)]
+    
+    if not new_starts.empty:
+        # Clean and sort the insights once instead of once per thread start
+        insights_index = build_insight_prefix_index(insights_df)
+        new_matches = {}
+        unmatched = []
+        for post_id, post_text, date in zip(new_starts['Post id'].astype(str), new_starts['post_text_normalized'], new_starts['Date']):
+            position = _prefix_lookup(insights_index, post_text)
+            if position is None:
+                new_matches[post_id] = [None] * len(MATCH_COLUMNS)
+                unmatched.append((post_id, post_text, date))
+            else:
+                new_matches[post_id] = insights_df.iloc[position][MATCH_COLUMNS].tolist()
+        
+        if unmatched:
+            # Second pass: fuzzy scores for tweets whose text drifted from the stored review
+            fuzzy_positions = fuzzy_match_insights(
+                [text for _, text, _ in unmatched],
+                [date for _, _, date in unmatched],
+                insights_df,
+                insights_df['tweet_insight_normalized'].tolist(),
+            )
+            for (post_id, _, _), position in zip(unmatched, fuzzy_positions):
+                if position is not None:
+                    new_matches[post_id] = insights_df.iloc[position][MATCH_COLUMNS].tolist()
+        new_matches = pd.DataFrame.from_dict(new_matches, orient='index', columns=MATCH_COLUMNS)
+        save_match_cache(fingerprint, new_matches)
+        matches = pd.concat([matches, new_matches])
+    
+    matched = matches.reindex(post_ids)
+    for column in MATCH_COLUMNS:
+        analytics_df.loc[thread_starts.index, column] = matched[column].values
     
-    return analytics_df
+    return compact_frame(analytics_df, "tweet_analytics")
 
 def get_thread_metrics(df, thread_id):
     """Calculate aggregated metrics for a thread."""
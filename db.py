@@ -1,7 +1,23 @@
+import io
+import json
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dt_time, timedelta
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.pool import QueuePool
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from caching import cached_loader, canonical_window, floor_to_bucket, get_bucket_size
+import instrumentation
+import notifications
+from dtypes import compact_frame
+from hll import HyperLogLog
 
 # Database connection parameters
 try:
@@ -18,423 +34,1163 @@ except:
 # Create database URL
 database_url = f"postgresql+psycopg2://{db_params['user']}:{db_params['password']}@{db_params['host']}:{db_params['port']}/{db_params['dbname']}"
 
+# Connection pool defaults, overridable via DB_* env vars (e.g. DB_POOL_SIZE) or the [db_pool] secrets section
+POOL_DEFAULTS = {
+    "pool_size": 5,
+    "max_overflow": 5,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "statement_timeout_ms": 30000,
+}
+
+_pool_stats = {
+    "checkouts": 0,
+    "checkins": 0,
+    "connects": 0,
+    "invalidations": 0,
+    "wait_count": 0,
+    "total_wait_s": 0.0,
+    "max_wait_s": 0.0,
+}
+_pool_stats_lock = threading.Lock()
+
+def get_database_url():
+    """Return the SQLAlchemy database URL."""
+    return database_url
+
+def get_pool_settings():
+    """Resolve pool settings from environment variables, then secrets, then defaults."""
+    try:
+        secret_settings = dict(st.secrets.get("db_pool", {}))
+    except Exception:
+        secret_settings = {}
+
+    settings = {}
+    for key, default in POOL_DEFAULTS.items():
+        value = os.environ.get(f"DB_{key.upper()}", secret_settings.get(key, default))
+        if isinstance(default, bool):
+            value = str(value).lower() in ("1", "true", "yes")
+        else:
+            value = type(default)(value)
+        settings[key] = value
+    return settings
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            with _pool_stats_lock:
+                _pool_stats["wait_count"] += 1
+                _pool_stats["total_wait_s"] += waited
+                _pool_stats["max_wait_s"] = max(_pool_stats["max_wait_s"], waited)
+
+def _count_pool_event(name):
+    def listener(*args):
+        with _pool_stats_lock:
+            _pool_stats[name] += 1
+    return listener
+
 @st.cache_resource
 def get_db_connection():
-    """Create and return a database connection"""
-    return create_engine(database_url)
+    """Create and return the process-wide pooled database engine."""
+    settings = get_pool_settings()
+    connect_args = {}
+    if settings["statement_timeout_ms"] > 0:
+        connect_args["options"] = f"-c statement_timeout={settings['statement_timeout_ms']}"
 
-@st.cache_data(ttl=3600)
-def load_visit_logs(start_date=None, end_date=None):
-    """Load visit logs with optional date filtering"""
-    query = "SELECT * FROM visit_logs"
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY tstp DESC"
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    engine = create_engine(
+        database_url,
+        poolclass=_TimedQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        pool_recycle=settings["pool_recycle"],
+        pool_pre_ping=settings["pool_pre_ping"],
+        connect_args=connect_args,
+    )
+
+    event.listen(engine, "checkout", _count_pool_event("checkouts"))
+    event.listen(engine, "checkin", _count_pool_event("checkins"))
+    event.listen(engine, "connect", _count_pool_event("connects"))
+    event.listen(engine, "invalidate", _count_pool_event("invalidations"))
+    instrumentation.attach_engine(engine)
+    return engine
+
+@st.cache_resource
+def start_change_listener():
+    """Start the process-wide LISTEN/NOTIFY listener (see notifications.py)."""
+    return notifications.start_listener(db_params)
 
-@st.cache_data(ttl=3600)
-def load_qna_logs(start_date=None, end_date=None):
-    """Load Q&A logs with optional date filtering"""
-    query = "SELECT * FROM qna_logs"
+def get_table_version(table):
+    """
+    Return a cheap version token for a watched table (e.g. "tweet_replies").
+
+    Pass it to the loader as `version` so cached results are reused until the table
+    changes; it falls back to advancing every notifications.POLL_SECONDS if the
+    listener is down.
+    """
+    start_change_listener()
+    return notifications.get_version(table)
+
+def get_pool_stats():
+    """Return pool sizing and checkout/wait statistics for the shared engine."""
+    pool = get_db_connection().pool
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    stats["avg_wait_ms"] = (
+        stats["total_wait_s"] / stats["wait_count"] * 1000 if stats["wait_count"] else 0.0
+    )
+    stats["max_wait_ms"] = stats.pop("max_wait_s") * 1000
+    stats.pop("total_wait_s")
+    stats.update({
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "status": pool.status(),
+    })
+    return stats
+
+def load_concurrently(tasks, max_workers=None):
+    """
+    Run independent loader calls in parallel and return their results by name.
+
+    Args:
+        tasks: Dict mapping a result name to a (loader, kwargs) tuple
+        max_workers: Optional thread cap; defaults to the engine's pool_size, so one
+            page never holds more connections than the pool keeps open
+
+    Returns:
+        dict: Result of each loader under its task name. If any loader raises, the
+        first error (in task order) is re-raised after all calls finish.
+    """
+    if not tasks:
+        return {}
+    max_workers = max(1, min(len(tasks), max_workers or get_pool_settings()["pool_size"]))
+    ctx = get_script_run_ctx()
+
+    def attach_ctx():
+        # Lets st.cache_data and friends inside the loaders see the calling session
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=max_workers, initializer=attach_ctx) as executor:
+        futures = {
+            name: executor.submit(loader, **kwargs)
+            for name, (loader, kwargs) in tasks.items()
+        }
+    return {name: future.result() for name, future in futures.items()}
+
+# Tables that can be passed by name to the generic stats loaders
+LOG_TABLES = ("visit_logs", "qna_logs", "error_logs", "workflow_runs", "token_usage_logs")
+
+# Total cost of a token_usage_logs row, treating missing cache costs as zero
+TOTAL_COST_SQL = "prompt_cost + completion_cost + COALESCE(cache_creation_cost, 0) + COALESCE(cache_read_cost, 0)"
+
+def _window_conditions(start_date=None, end_date=None, time_column="tstp"):
+    """Return bound-parameter conditions and values for an optional time window."""
     conditions = []
-    
+    params = {}
     if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
+        conditions.append(f"{time_column} >= :start_date")
+        params["start_date"] = start_date
     if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY tstp DESC"
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+        conditions.append(f"{time_column} <= :end_date")
+        params["end_date"] = end_date
+    return conditions, params
 
-@st.cache_data(ttl=3600)
-def load_error_logs(start_date=None, end_date=None):
-    """Load error logs with optional date filtering"""
-    query = "SELECT * FROM error_logs"
-    conditions = []
-    
+def _where(conditions):
+    """Render a WHERE clause from a list of conditions."""
+    return "\nWHERE " + " AND ".join(conditions) if conditions else ""
+
+def build_query(select_sql, start_date=None, end_date=None, time_column="tstp", conditions=None, suffix="", params=None):
+    """
+    Build a parameterized statement filtered to an optional time window.
+
+    Values are always bound, never interpolated, so the SQL text only depends on
+    which bounds are present and Postgres sees the same statement on every call.
+
+    Args:
+        select_sql: SELECT ... FROM ... part of the query
+        start_date: Optional inclusive lower bound on `time_column`
+        end_date: Optional inclusive upper bound on `time_column`
+        time_column: Column the window applies to
+        conditions: Extra WHERE conditions (using bound parameters)
+        suffix: GROUP BY / ORDER BY / LIMIT clauses appended after WHERE
+        params: Values for any extra bound parameters
+
+    Returns:
+        tuple: (TextClause, params dict)
+    """
+    window, window_params = _window_conditions(start_date, end_date, time_column)
+    query = select_sql.strip() + _where(list(conditions or []) + window)
+    if suffix:
+        query += "\n" + suffix.strip()
+    return text(query), {**(params or {}), **window_params}
+
+# How result rows are transferred: "read_sql" builds Python tuples via the DBAPI cursor,
+# "copy" streams CSV through COPY ... TO STDOUT and parses it column by column
+FETCH_ENGINES = ("read_sql", "copy")
+DEFAULT_FETCH_ENGINE = os.environ.get("DB_FETCH_ENGINE", "read_sql")
+
+# Postgres type OIDs that need explicit conversion on the COPY path
+_BOOL_OIDS = {16}
+_NUMERIC_OIDS = {20, 21, 23, 700, 701, 1700}
+_JSON_OIDS = {114, 3802}
+_DATE_OIDS = {1082}
+_TIMESTAMP_OIDS = {1114}
+_TIMESTAMPTZ_OIDS = {1184}
+_COPY_NULL = r"\N"
+
+def read_query(statement, params=None, fetch_engine=None):
+    """Execute a parameterized statement on the shared engine and return a DataFrame."""
+    fetch_engine = fetch_engine or DEFAULT_FETCH_ENGINE
+    if fetch_engine == "copy":
+        return _read_query_copy(statement, params)
+    if fetch_engine != "read_sql":
+        raise ValueError(f"Unknown fetch engine: {fetch_engine}")
+    return pd.read_sql(statement, get_db_connection(), params=params or {})
+
+def _read_query_copy(statement, params=None):
+    """
+    Fetch a query with COPY ... TO STDOUT and parse the CSV into typed columns.
+
+    Column types come from a zero-row execution of the same query, so timestamps,
+    booleans, JSON and text columns get the same types as the read_sql path.
+    """
+    engine = get_db_connection()
+    compiled = statement.compile(dialect=engine.dialect)
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            query = cursor.mogrify(str(compiled), compiled.construct_params(params or {})).decode()
+            # Raw cursors bypass the engine's events, so time the round trips here
+            started = time.perf_counter()
+            cursor.execute(f"SELECT * FROM ({query}) AS q LIMIT 0")
+            columns = [(column.name, column.type_code) for column in cursor.description]
+            buffer = io.BytesIO()
+            cursor.copy_expert(
+                f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true, NULL '{_COPY_NULL}')", buffer
+            )
+            instrumentation.record_sql(f"COPY ({query}) TO STDOUT", time.perf_counter() - started)
+        raw_connection.rollback()
+    finally:
+        raw_connection.close()
+
+    buffer.seek(0)
+    frame = pd.read_csv(
+        buffer,
+        dtype={name: object for name, oid in columns if oid not in _NUMERIC_OIDS | _BOOL_OIDS},
+        na_values=[_COPY_NULL],
+        keep_default_na=False,
+        true_values=["t"],
+        false_values=["f"],
+    )
+    for name, oid in columns:
+        if oid in _TIMESTAMPTZ_OIDS:
+            frame[name] = pd.to_datetime(frame[name], utc=True, format="ISO8601")
+        elif oid in _TIMESTAMP_OIDS:
+            frame[name] = pd.to_datetime(frame[name], format="ISO8601")
+        elif oid in _DATE_OIDS:
+            frame[name] = pd.to_datetime(frame[name], format="ISO8601").dt.date
+        elif oid in _JSON_OIDS:
+            frame[name] = frame[name].map(json.loads, na_action="ignore")
+    return frame
+
+# Column sets for pages that only render part of a table, so wide text columns
+# (responses, thinking processes, error messages) are only transferred when shown
+COLUMN_PRESETS = {
+    "telemetry_visits": ("id", "tstp"),
+    "telemetry_qna": ("id", "tstp", "user_question", "response"),
+    "telemetry_errors": ("id", "tstp", "error"),
+    "workflow_monitor": ("id", "tstp", "step_name", "status", "error_message"),
+    "cost_analytics": (
+        "id", "tstp", "model_name", "process_id",
+        "prompt_tokens", "completion_tokens", "cache_creation_input_tokens", "cache_read_input_tokens",
+        "prompt_cost", "completion_cost", "cache_creation_cost", "cache_read_cost",
+    ),
+    "discussions_analysis": ("tstp", "start_date", "end_date", "unique_tweets", "response", "thinking_process"),
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def resolve_columns(columns, required=()):
+    """
+    Normalize a column projection to a tuple, adding required columns.
+
+    Args:
+        columns: None for all columns, a COLUMN_PRESETS name, or an iterable of column names
+        required: Columns that must always be selected (e.g. tstp, id)
+
+    Returns:
+        tuple of column names, or None for SELECT *
+    """
+    if columns is None:
+        return None
+    if isinstance(columns, str):
+        columns = COLUMN_PRESETS[columns]
+    columns = tuple(dict.fromkeys([*required, *columns]))
+    for column in columns:
+        if not _IDENTIFIER.match(column):
+            raise ValueError(f"Invalid column name: {column}")
+    return columns
+
+def _select_list(columns):
+    """Render a resolved projection as a SELECT list."""
+    return ", ".join(columns) if columns else "*"
+
+def _check_log_table(table_name):
+    """Reject table names outside LOG_TABLES, since identifiers cannot be bound."""
+    if table_name not in LOG_TABLES:
+        raise ValueError(f"Unknown log table: {table_name}")
+
+# Append-only tables that can be refreshed incrementally, with their unique key column
+APPEND_ONLY_TABLES = {
+    "visit_logs": "id",
+    "qna_logs": "id",
+    "error_logs": "id",
+    "workflow_runs": "id",
+    "token_usage_logs": "id",
+}
+
+# Maximum number of incrementally maintained windows kept in memory
+MAX_INCREMENTAL_WINDOWS = 16
+
+# Re-read this much history before the watermark to catch rows committed late
+INCREMENTAL_OVERLAP = timedelta(minutes=5)
+
+_incremental_windows = OrderedDict()
+_incremental_locks = {}
+_incremental_lock = threading.Lock()
+
+def _align_tz(ts, series):
+    """Make a Python timestamp comparable with a datetime Series."""
+    ts = pd.Timestamp(ts)
+    column_tz = getattr(series.dt, "tz", None)
+    if column_tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(column_tz)
+    if column_tz is None and ts.tzinfo is not None:
+        return ts.tz_convert(None)
+    return ts
+
+def _window_lock(key):
+    """Return the lock serializing refreshes of one incremental window."""
+    with _incremental_lock:
+        return _incremental_locks.setdefault(key, threading.Lock())
+
+def load_incremental(table_name, start_date=None, end_date=None, columns=None, fetch_engine=None):
+    """
+    Load a window of an append-only table, fetching only rows added since the last call.
+
+    Each window (table and window length) keeps its frame and a `tstp` watermark in
+    process memory. Later calls only select rows from the watermark on (minus a short
+    overlap for late commits), replace duplicates by the table's key column and drop
+    rows that fell out of the window. State lives outside st.cache_data, so "Refresh
+    Data Cache" stays cheap. Windows that end in the past use a plain query.
+
+    Args:
+        table_name: One of APPEND_ONLY_TABLES
+        start_date: Optional inclusive lower bound on tstp
+        end_date: Optional inclusive upper bound on tstp
+        columns: Optional projection (see resolve_columns); tstp and the key column are always included
+        fetch_engine: "read_sql" or "copy" (see FETCH_ENGINES); defaults to DB_FETCH_ENGINE
+
+    Returns:
+        DataFrame ordered by tstp descending
+    """
+    if table_name not in APPEND_ONLY_TABLES:
+        raise ValueError(f"Table is not registered as append-only: {table_name}")
+
+    key_column = APPEND_ONLY_TABLES[table_name]
+    columns = resolve_columns(columns, required=("tstp", key_column))
+    select_sql = f"SELECT {_select_list(columns)} FROM {table_name}"
+    now = datetime.now(getattr(end_date or start_date, "tzinfo", None))
+    if end_date and end_date < now:
+        return read_query(*build_query(select_sql, start_date, end_date, suffix="ORDER BY tstp DESC"), fetch_engine)
+
+    # Sliding windows keep the same key as they move forward, e.g. "last 30 days": the
+    # span is measured between bucket boundaries (start_date arrives aligned by
+    # cached_loader), so it does not drift with the wall clock between them
+    span = None
     if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY tstp DESC"
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+        window_start, _ = canonical_window(start_date, now=now)
+        span = floor_to_bucket(now, get_bucket_size(start_date, now=now)) - window_start
+    key = (table_name, span, columns)
+
+    with _window_lock(key):
+        state = _incremental_windows.get(key)
+        covers_window = state is not None and (
+            state["start_date"] is None or (start_date is not None and start_date >= state["start_date"])
+        )
+
+        if not covers_window:
+            frame = read_query(*build_query(select_sql, start_date, suffix="ORDER BY tstp DESC"), fetch_engine)
+            watermark = start_date
+        else:
+            frame = state["frame"]
+            watermark = state["watermark"]
+            since = watermark - INCREMENTAL_OVERLAP if watermark else None
+            new_rows = read_query(*build_query(select_sql, since, suffix="ORDER BY tstp DESC"), fetch_engine)
+            if not new_rows.empty:
+                frame = pd.concat([new_rows, frame], ignore_index=True)
+                frame = frame.drop_duplicates(subset=key_column, keep="first")
+                frame = frame.sort_values("tstp", ascending=False, kind="stable", ignore_index=True)
+            if start_date is not None and not frame.empty:
+                frame = frame[frame["tstp"] >= _align_tz(start_date, frame["tstp"])].reset_index(drop=True)
+
+        if not frame.empty:
+            watermark = frame["tstp"].max().to_pydatetime()
 
-@st.cache_data(ttl=3600)
+        with _incremental_lock:
+            _incremental_windows[key] = {"frame": frame, "watermark": watermark, "start_date": start_date}
+            _incremental_windows.move_to_end(key)
+            while len(_incremental_windows) > MAX_INCREMENTAL_WINDOWS:
+                _incremental_windows.popitem(last=False)
+
+    if end_date and not frame.empty:
+        return frame[frame["tstp"] <= _align_tz(end_date, frame["tstp"])].reset_index(drop=True)
+    # The stored frame is shared with later calls; callers get their own copy
+    return frame.copy()
+
+# How long a table change probe is reused before the counters are read again
+PROBE_TTL = 30
+
+# Raw log frames are the largest cached results, and their tables change every probe
+RAW_LOG_MAX_ENTRIES = 4
+
+# Change token for tables pg_stat_user_tables does not track (e.g. a rollup that is not
+# installed yet); stable, so such loaders fall back to their ttl instead of rescanning
+UNTRACKED_TABLE = "untracked"
+
+@cached_loader(ttl=PROBE_TTL)
+def get_table_change_counters(tables):
+    """
+    Return a cheap change token per table, used as part of the cached loaders' keys.
+
+    Reads the cumulative insert/update/delete counts from pg_stat_user_tables in one
+    catalog lookup and never touches the tables themselves; tables without a stats row
+    get UNTRACKED_TABLE. Stats counters lag commits by up to a second or so. Errors
+    propagate, so instrumentation records them against this loader.
+    """
+    stats = read_query(
+        text("""
+            SELECT relname, n_tup_ins + n_tup_upd + n_tup_del AS changes, n_live_tup
+            FROM pg_stat_user_tables
+            WHERE schemaname = current_schema() AND relname = ANY(:tables)
+        """),
+        {"tables": list(tables)},
+    )
+    counters = dict.fromkeys(tables, UNTRACKED_TABLE)
+    for row in stats.itertuples(index=False):
+        counters[row.relname] = (int(row.changes), int(row.n_live_tup))
+    return counters
+
+def table_probe(*tables, argument=None):
+    """
+    Build a cached_loader probe over fixed tables and/or the table named by one of the
+    loader's arguments (e.g. argument="table_name").
+    """
+    def probe(arguments):
+        names = set(tables)
+        if argument is not None:
+            names.add(arguments[argument])
+        return get_table_change_counters(tuple(sorted(names)))
+    return probe
+
+@cached_loader(ttl=3600, probe=table_probe("visit_logs"), max_entries=RAW_LOG_MAX_ENTRIES)
+def load_visit_logs(start_date=None, end_date=None, columns=None, fetch_engine=None):
+    """Load visit logs with optional date filtering and column projection"""
+    return compact_frame(load_incremental("visit_logs", start_date, end_date, columns, fetch_engine), "visit_logs")
+
+@cached_loader(ttl=3600, probe=table_probe("qna_logs"), max_entries=RAW_LOG_MAX_ENTRIES)
+def load_qna_logs(start_date=None, end_date=None, columns=None, fetch_engine=None):
+    """Load Q&A logs with optional date filtering and column projection"""
+    return load_incremental("qna_logs", start_date, end_date, columns, fetch_engine)
+
+@cached_loader(ttl=3600, probe=table_probe("error_logs"), max_entries=RAW_LOG_MAX_ENTRIES)
+def load_error_logs(start_date=None, end_date=None, columns=None, fetch_engine=None):
+    """Load error logs with optional date filtering and column projection"""
+    return load_incremental("error_logs", start_date, end_date, columns, fetch_engine)
+
+def _top_entrypoints_query(limit=10, start_date=None, end_date=None):
+    """Build the query behind get_top_entrypoints."""
+    return build_query(
+        """
+        SELECT entrypoint, COUNT(*) as count
+        FROM visit_logs
+        """,
+        start_date,
+        end_date,
+        suffix="""
+        GROUP BY entrypoint
+        ORDER BY count DESC
+        LIMIT :limit
+        """,
+        params={"limit": int(limit)},
+    )
+
+@cached_loader(ttl=3600, probe=table_probe("visit_logs"))
 def get_top_entrypoints(limit=10, start_date=None, end_date=None):
     """Get the most common entrypoints"""
-    query = """
-    SELECT entrypoint, COUNT(*) as count
-    FROM visit_logs
-    """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY entrypoint
-    ORDER BY count DESC
-    LIMIT %d
-    """ % limit
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    return read_query(*_top_entrypoints_query(limit, start_date, end_date))
 
-@st.cache_data(ttl=3600)
+def _hourly_stats_query(table_name, start_date=None, end_date=None):
+    """Build the query behind get_hourly_stats; hours without rows count as zero."""
+    _check_log_table(table_name)
+    conditions, params = _window_conditions(start_date, end_date)
+    return text(f"""
+        SELECT 
+            hours.hour,
+            COALESCE(counts.count, 0) as count
+        FROM generate_series(0, 23) AS hours(hour)
+        LEFT JOIN (
+            SELECT EXTRACT(HOUR FROM tstp) as hour, COUNT(*) as count
+            FROM {table_name}{_where(conditions)}
+            GROUP BY EXTRACT(HOUR FROM tstp)
+        ) AS counts ON counts.hour = hours.hour
+        ORDER BY hours.hour
+    """), params
+
+@cached_loader(ttl=3600, probe=table_probe(argument="table_name"))
 def get_hourly_stats(table_name, start_date=None, end_date=None):
     """Get hourly statistics for any of the log tables"""
-    query = f"""
-    SELECT 
-        EXTRACT(HOUR FROM tstp) as hour,
-        COUNT(*) as count
-    FROM {table_name}
+    return read_query(*_hourly_stats_query(table_name, start_date, end_date))
+
+# Tables time_buckets can aggregate, with the column their rows are timed by
+TIME_BUCKET_TABLES = {
+    **{table: "tstp" for table in LOG_TABLES},
+    "feature_poll_votes": "tstp",
+    "tweet_analysis": "tstp",
+    "llm_tweets": "tweet_timestamp",
+}
+
+# Bucket granularities, finest first: (Postgres interval, widest bucket)
+TIME_GRANULARITIES = {
+    "minute": ("1 minute", timedelta(minutes=1)),
+    "hour": ("1 hour", timedelta(hours=1)),
+    "day": ("1 day", timedelta(days=1)),
+    "week": ("1 week", timedelta(weeks=1)),
+    "month": ("1 month", timedelta(days=31)),
+}
+
+# Most points granularity="auto" will put in one series
+MAX_TIME_BUCKETS = 400
+
+def _time_buckets_query(table, granularity, metrics=None, filters=None, start_date=None, end_date=None, params=None):
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY EXTRACT(HOUR FROM tstp)
-    ORDER BY hour
+    Build a dense time series query: one row per bucket from the window start to its
+    end (or now), with empty buckets filled with zero.
+
+    Metrics and filters are SQL written by the caller, never user input.
     """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    if table not in TIME_BUCKET_TABLES:
+        raise ValueError(f"Unknown time bucket table: {table}")
+    if granularity not in TIME_GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    metrics = metrics or {"count": "COUNT(*)"}
+    for name in metrics:
+        if not _IDENTIFIER.match(name):
+            raise ValueError(f"Invalid metric name: {name!r}")
+
+    time_column = TIME_BUCKET_TABLES[table]
+    interval = TIME_GRANULARITIES[granularity][0]
+    bucket_sql = f"CAST(date_trunc('{granularity}', {time_column}) AS timestamp)"
+    conditions, window_params = _window_conditions(start_date, end_date, time_column)
+    filters = list(filters or [])
+    params = {**(params or {}), **window_params}
+
+    # All Time starts the series at the first row rather than at the epoch
+    series_start = (
+        "CAST(:start_date AS timestamp)" if start_date
+        else f"(SELECT MIN(CAST({time_column} AS timestamp)) FROM {table}{_where(filters)})"
+    )
+    series_end = "CAST(:end_date AS timestamp)" if end_date else "LOCALTIMESTAMP"
+
+    metric_sql = ",\n            ".join(f"{expression} as {name}" for name, expression in metrics.items())
+    filled_sql = ",\n            ".join(f"COALESCE(data.{name}, 0) as {name}" for name in metrics)
+    return text(f"""
+        WITH series AS (
+            SELECT generate_series(
+                date_trunc('{granularity}', {series_start}),
+                date_trunc('{granularity}', {series_end}),
+                INTERVAL '{interval}'
+            ) AS bucket
+        ),
+        data AS (
+            SELECT 
+                {bucket_sql} as bucket,
+                {metric_sql}
+            FROM {table}{_where(conditions + filters)}
+            GROUP BY 1
+        )
+        SELECT 
+            series.bucket,
+            {filled_sql}
+        FROM series
+        LEFT JOIN data ON data.bucket = series.bucket
+        ORDER BY series.bucket
+    """), params
 
-@st.cache_data(ttl=3600)
+def pick_granularity(table, start_date=None, end_date=None, max_points=MAX_TIME_BUCKETS):
+    """Return the finest granularity that keeps the window within max_points buckets."""
+    if not start_date:
+        # All Time: size the buckets from the table's first row
+        time_column = TIME_BUCKET_TABLES[table]
+        statement = text(f"SELECT MIN(CAST({time_column} AS timestamp)) FROM {table}")
+        with get_db_connection().connect() as connection:
+            start_date = connection.execute(statement).scalar()
+        if start_date is None:
+            return "day"
+    span = (end_date or datetime.now(start_date.tzinfo)) - start_date
+    for granularity, (_, width) in TIME_GRANULARITIES.items():
+        if span / width <= max_points:
+            return granularity
+    return "month"
+
+@cached_loader(ttl=3600, probe=table_probe(argument="table"))
+def time_buckets(table, granularity="auto", metrics=None, filters=None, start_date=None, end_date=None, params=None):
+    """
+    Aggregate a table into a gap-filled time series.
+
+    Args:
+        table: One of TIME_BUCKET_TABLES
+        granularity: "minute", "hour", "day", "week", "month", or "auto" to pick
+            the finest one that stays under MAX_TIME_BUCKETS points
+        metrics: Dict of output column -> SQL aggregate (default {"count": "COUNT(*)"})
+        filters: Optional list of extra SQL conditions, with values in params
+        start_date: Optional start date filter
+        end_date: Optional end date filter
+
+    Returns:
+        DataFrame with a `bucket` timestamp column and one column per metric
+    """
+    if granularity == "auto":
+        granularity = pick_granularity(table, start_date, end_date)
+    frame = read_query(*_time_buckets_query(table, granularity, metrics, filters, start_date, end_date, params))
+    frame.attrs["granularity"] = granularity
+    return frame
+
+def _daily_stats_query(table_name, start_date=None, end_date=None):
+    """Build the query behind get_daily_stats: a gap-filled daily count."""
+    _check_log_table(table_name)
+    statement, params = _time_buckets_query(table_name, "day", start_date=start_date, end_date=end_date)
+    return text(f"SELECT CAST(bucket AS date) as date, count FROM ({statement.text}) AS daily"), params
+
+@cached_loader(ttl=3600, probe=table_probe(argument="table_name"))
 def get_daily_stats(table_name, start_date=None, end_date=None):
     """Get daily statistics for any of the log tables"""
-    query = f"""
-    SELECT 
-        DATE(tstp) as date,
-        COUNT(*) as count
-    FROM {table_name}
+    return read_query(*_daily_stats_query(table_name, start_date, end_date))
+
+@cached_loader(ttl=3600, probe=table_probe("workflow_runs"), max_entries=RAW_LOG_MAX_ENTRIES)
+def load_workflow_runs(start_date=None, end_date=None, columns=None, fetch_engine=None):
+    """Load workflow runs with optional date filtering and column projection."""
+    return load_incremental("workflow_runs", start_date, end_date, columns, fetch_engine)
+
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs"), max_entries=RAW_LOG_MAX_ENTRIES)
+def load_token_usage_logs(start_date=None, end_date=None, columns=None, fetch_engine=None):
+    """Load token usage logs with optional date filtering and column projection."""
+    return compact_frame(load_incremental("token_usage_logs", start_date, end_date, columns, fetch_engine), "token_usage_logs")
+
+# Rows per DataFrame chunk when streaming through a server-side cursor
+STREAM_CHUNK_SIZE = 50_000
+
+# Token and cost columns summed by the token usage aggregations
+USAGE_SUM_COLUMNS = [
+    "prompt_tokens", "completion_tokens", "cache_creation_input_tokens", "cache_read_input_tokens",
+    "prompt_cost", "completion_cost", "cache_creation_cost", "cache_read_cost",
+]
+USAGE_GROUP_COLUMNS = ["date", "model_name", "process_id"]
+
+def iter_query_chunks(statement, params=None, chunksize=STREAM_CHUNK_SIZE):
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY DATE(tstp)
-    ORDER BY date
+    Stream a query as DataFrame chunks through a named server-side cursor.
+
+    Only one chunk of rows is held client-side at a time; the connection stays
+    checked out until the generator is exhausted or closed.
     """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    engine = get_db_connection()
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as connection:
+        for chunk in pd.read_sql(statement, connection, params=params or {}, chunksize=chunksize):
+            yield chunk
 
-@st.cache_data(ttl=3600)
-def load_workflow_runs(start_date=None, end_date=None):
-    """Load workflow runs with optional date filtering."""
-    query = "SELECT * FROM workflow_runs"
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY tstp DESC"
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+def stream_token_usage_logs(start_date=None, end_date=None, columns="cost_analytics", chunksize=STREAM_CHUNK_SIZE):
+    """
+    Yield token usage log rows in fixed-size DataFrame chunks.
 
-@st.cache_data(ttl=3600)
-def load_token_usage_logs(start_date=None, end_date=None):
-    """Load token usage logs with optional date filtering."""
-    query = "SELECT * FROM token_usage_logs"
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY tstp DESC"
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    Each row also carries `date` as DATE(tstp), bucketed in the session TimeZone like
+    the SQL aggregations, rather than the UTC day pandas would derive from tstp.
+    """
+    columns = resolve_columns(columns, required=("tstp",))
+    statement, params = build_query(
+        f"SELECT DATE(tstp) as date, {_select_list(columns)} FROM token_usage_logs", start_date, end_date
+    )
+    yield from iter_query_chunks(statement, params, chunksize)
 
-@st.cache_data(ttl=3600)
-def get_model_stats(start_date=None, end_date=None):
-    """Get aggregated stats per model."""
-    query = """
-    SELECT 
-        model_name,
-        COUNT(*) as total_runs,
-        SUM(prompt_tokens) as total_prompt_tokens,
-        SUM(completion_tokens) as total_completion_tokens,
-        SUM(cache_creation_input_tokens) as total_cache_creation_tokens,
-        SUM(cache_read_input_tokens) as total_cache_read_tokens,
-        SUM(prompt_cost) as total_prompt_cost,
-        SUM(completion_cost) as total_completion_cost,
-        SUM(cache_creation_cost) as total_cache_creation_cost,
-        SUM(cache_read_cost) as total_cache_read_cost,
-        SUM(prompt_cost + completion_cost + COALESCE(cache_creation_cost, 0) + COALESCE(cache_read_cost, 0)) as total_cost
-    FROM token_usage_logs
+def aggregate_token_usage(chunks, compact_every=20):
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY model_name
-    ORDER BY total_cost DESC
+    Reduce token usage chunks (with a `date` column, see stream_token_usage_logs) to
+    daily sums per model and process.
+
+    Sums keep SQL semantics: a group whose values are all NULL stays NULL. Each
+    chunk is grouped on arrival and partial results are re-combined every
+    `compact_every` chunks, so memory is bounded by the number of distinct
+    (date, model_name, process_id) groups rather than by the number of rows.
+
+    Returns:
+        DataFrame with columns: date, model_name, process_id, total_runs and the
+        USAGE_SUM_COLUMNS sums
     """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    def combine(frames):
+        combined = pd.concat(frames, ignore_index=True)
+        return combined.groupby(USAGE_GROUP_COLUMNS, dropna=False, as_index=False).sum(min_count=1)
 
-@st.cache_data(ttl=3600)
-def get_process_stats(start_date=None, end_date=None):
-    """Get aggregated stats per process."""
-    query = """
-    SELECT 
+    partials = []
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        chunk = chunk.assign(total_runs=1)
+        partials.append(combine([chunk[USAGE_GROUP_COLUMNS + ["total_runs"] + USAGE_SUM_COLUMNS]]))
+        if len(partials) >= compact_every:
+            partials = [combine(partials)]
+
+    if not partials:
+        return pd.DataFrame(columns=USAGE_GROUP_COLUMNS + ["total_runs"] + USAGE_SUM_COLUMNS)
+    return combine(partials).sort_values("date", ignore_index=True)
+
+# Materialized daily token usage (maintained by rollups.py) and its refresh bookkeeping
+ROLLUP_TABLE = "token_usage_daily_rollup"
+ROLLUP_STATE_TABLE = "rollup_watermarks"
+
+# Daily usage rows share one shape whether they come from the rollup or from raw logs
+DAILY_USAGE_COLUMNS = USAGE_GROUP_COLUMNS + ["total_runs"] + USAGE_SUM_COLUMNS + ["total_cost"]
+DAILY_USAGE_SELECT = f"""
+    SELECT
+        DATE(tstp) as date,
+        model_name,
         process_id,
         COUNT(*) as total_runs,
-        SUM(prompt_tokens) as total_prompt_tokens,
-        SUM(completion_tokens) as total_completion_tokens,
-        SUM(cache_creation_input_tokens) as total_cache_creation_tokens,
-        SUM(cache_read_input_tokens) as total_cache_read_tokens,
-        SUM(prompt_cost) as total_prompt_cost,
-        SUM(completion_cost) as total_completion_cost,
-        SUM(cache_creation_cost) as total_cache_creation_cost,
-        SUM(cache_read_cost) as total_cache_read_cost,
-        SUM(prompt_cost + completion_cost + COALESCE(cache_creation_cost, 0) + COALESCE(cache_read_cost, 0)) as total_cost
+        {", ".join(f"SUM({column}) as {column}" for column in USAGE_SUM_COLUMNS)},
+        SUM({TOTAL_COST_SQL}) as total_cost
     FROM token_usage_logs
+"""
+DAILY_USAGE_GROUP_BY = "GROUP BY DATE(tstp), model_name, process_id"
+
+@cached_loader(ttl=300, probe=table_probe(ROLLUP_STATE_TABLE))
+def get_rollup_complete_through():
+    """Return the first day the token usage rollup does not fully cover, or None if it is not installed."""
+    try:
+        result = read_query(
+            text(f"SELECT complete_through FROM {ROLLUP_STATE_TABLE} WHERE rollup_name = :name"),
+            {"name": ROLLUP_TABLE},
+        )
+    except (ProgrammingError, pd.errors.DatabaseError):
+        return None
+    return result["complete_through"].iloc[0] if not result.empty else None
+
+def _split_full_days(start_date, end_date, complete_through, time_column="tstp"):
     """
-    conditions = []
-    
+    Split a window into whole days a precomputed table covers and raw edges.
+
+    A day is whole when the window covers both of its midnights and it falls before
+    complete_through (the first day the table does not fully cover).
+
+    Returns:
+        tuple: (conditions on a `date` column, one condition on time_column for
+        the remaining raw rows, params), or None when no whole day is inside
+    """
+    first_full = None
     if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
+        first_full = start_date.date() if start_date.time() == dt_time.min else start_date.date() + timedelta(days=1)
+    last_full = complete_through - timedelta(days=1)
     if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY process_id
-    ORDER BY total_cost DESC
+        last_full = min(last_full, end_date.date() - timedelta(days=1))
+    if first_full is not None and first_full > last_full:
+        return None
+
+    day_conditions = ["date <= :full_end"]
+    params = {
+        "full_end": last_full,
+        "raw_after": datetime.combine(last_full + timedelta(days=1), dt_time.min),
+    }
+    edge_conditions = [f"({time_column} >= :raw_after" + (f" AND {time_column} <= :end_date)" if end_date else ")")]
+    if first_full is not None:
+        day_conditions.append("date >= :full_start")
+        params["full_start"] = first_full
+        params["raw_before"] = datetime.combine(first_full, dt_time.min)
+        edge_conditions.append(f"({time_column} >= :start_date AND {time_column} < :raw_before)")
+    return day_conditions, "(" + " OR ".join(edge_conditions) + ")", params
+
+def daily_usage_source(start_date=None, end_date=None):
     """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    Build a subquery of daily token usage rows for a window.
+
+    Whole days already covered by the rollup are read from ROLLUP_TABLE; partial
+    days at the window edges and days since the last refresh are aggregated from
+    raw token_usage_logs. Without a rollup everything comes from raw rows.
+
+    Returns:
+        tuple: (SQL string with DAILY_USAGE_COLUMNS, params dict)
+    """
+    complete_through = get_rollup_complete_through()
+    raw_conditions, params = _window_conditions(start_date, end_date)
+    raw_sql = f"{DAILY_USAGE_SELECT.strip()}{{where}}\n{DAILY_USAGE_GROUP_BY}"
+    split = _split_full_days(start_date, end_date, complete_through) if complete_through else None
+    if split is None:
+        return raw_sql.format(where=_where(raw_conditions)), params
+
+    rollup_conditions, edge_condition, split_params = split
+    params.update(split_params)
+    rollup_sql = f"SELECT {', '.join(DAILY_USAGE_COLUMNS)} FROM {ROLLUP_TABLE}{_where(rollup_conditions)}"
+    edge_sql = raw_sql.format(where=_where([edge_condition]))
+    return f"{rollup_sql}\nUNION ALL\n{edge_sql}", params
 
-@st.cache_data(ttl=3600)
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
+def load_token_usage_daily(start_date=None, end_date=None):
+    """
+    Load daily token usage sums per model and process.
+
+    Reads the rollup when it is installed; otherwise streams raw rows through a
+    server-side cursor and aggregates them in bounded memory.
+    """
+    if get_rollup_complete_through() is None:
+        return compact_frame(aggregate_token_usage(stream_token_usage_logs(start_date, end_date)), "token_usage_daily")
+    source, params = daily_usage_source(start_date, end_date)
+    return compact_frame(read_query(text(f"""
+        SELECT {", ".join(USAGE_GROUP_COLUMNS)}, SUM(total_runs) as total_runs,
+            {", ".join(f"SUM({column}) as {column}" for column in USAGE_SUM_COLUMNS)}
+        FROM ({source}) AS usage
+        GROUP BY {", ".join(USAGE_GROUP_COLUMNS)}
+        ORDER BY date
+    """), params), "token_usage_daily")
+
+def _usage_stats_query(group_column, start_date=None, end_date=None):
+    """Build the per-model / per-process aggregation over daily token usage."""
+    source, params = daily_usage_source(start_date, end_date)
+    return text(f"""
+        SELECT 
+            {group_column},
+            SUM(total_runs) as total_runs,
+            SUM(prompt_tokens) as total_prompt_tokens,
+            SUM(completion_tokens) as total_completion_tokens,
+            SUM(cache_creation_input_tokens) as total_cache_creation_tokens,
+            SUM(cache_read_input_tokens) as total_cache_read_tokens,
+            SUM(prompt_cost) as total_prompt_cost,
+            SUM(completion_cost) as total_completion_cost,
+            SUM(cache_creation_cost) as total_cache_creation_cost,
+            SUM(cache_read_cost) as total_cache_read_cost,
+            SUM(total_cost) as total_cost
+        FROM ({source}) AS usage
+        GROUP BY {group_column}
+        ORDER BY total_cost DESC
+    """), params
+
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
+def get_model_stats(start_date=None, end_date=None):
+    """Get aggregated stats per model."""
+    return read_query(*_usage_stats_query("model_name", start_date, end_date))
+
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
+def get_process_stats(start_date=None, end_date=None):
+    """Get aggregated stats per process."""
+    return read_query(*_usage_stats_query("process_id", start_date, end_date))
+
+def _daily_cost_stats_query(start_date=None, end_date=None):
+    """Build the query behind get_daily_cost_stats."""
+    source, params = daily_usage_source(start_date, end_date)
+    return text(f"""
+        SELECT 
+            date,
+            SUM(prompt_cost) as prompt_cost,
+            SUM(completion_cost) as completion_cost,
+            SUM(cache_creation_cost) as cache_creation_cost,
+            SUM(cache_read_cost) as cache_read_cost,
+            SUM(total_cost) as total_cost,
+            SUM(total_runs) as total_runs
+        FROM ({source}) AS usage
+        GROUP BY date
+        ORDER BY date
+    """), params
+
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
 def get_daily_cost_stats(start_date=None, end_date=None):
     """Get daily cost statistics."""
-    query = """
-    SELECT 
-        DATE(tstp) as date,
-        SUM(prompt_cost) as prompt_cost,
-        SUM(completion_cost) as completion_cost,
-        SUM(cache_creation_cost) as cache_creation_cost,
-        SUM(cache_read_cost) as cache_read_cost,
-        SUM(prompt_cost + completion_cost + COALESCE(cache_creation_cost, 0) + COALESCE(cache_read_cost, 0)) as total_cost,
-        COUNT(*) as total_runs
-    FROM token_usage_logs
+    return read_query(*_daily_cost_stats_query(start_date, end_date))
+
+def _tweet_analysis_query(start_date=None, end_date=None, columns=None):
+    """Build the query behind load_tweet_analysis."""
+    columns = resolve_columns(columns, required=("tstp",))
+    return build_query(
+        f"SELECT {_select_list(columns)} FROM tweet_analysis", start_date, end_date, suffix="ORDER BY tstp DESC"
+    )
+
+@cached_loader(ttl=3600, probe=table_probe("tweet_analysis"))
+def load_tweet_analysis(start_date=None, end_date=None, columns=None) -> pd.DataFrame:
+    """Load tweet analysis results with optional date filtering and column projection."""
+    return read_query(*_tweet_analysis_query(start_date, end_date, columns))
+
+# Daily HyperLogLog sketches of llm_tweets authors, refreshed by rollups.py
+AUTHOR_SKETCH_TABLE = "llm_tweets_author_sketches"
+
+@cached_loader(ttl=300, probe=table_probe(ROLLUP_STATE_TABLE))
+def get_author_sketch_complete_through():
+    """Return the first day the author sketches do not fully cover, or None if they are not installed."""
+    try:
+        result = read_query(
+            text(f"SELECT complete_through FROM {ROLLUP_STATE_TABLE} WHERE rollup_name = :name"),
+            {"name": AUTHOR_SKETCH_TABLE},
+        )
+    except (ProgrammingError, pd.errors.DatabaseError):
+        return None
+    return result["complete_through"].iloc[0] if not result.empty else None
+
+def _author_sketch_split(start_date=None, end_date=None):
+    """Split a window into days with author sketches and raw edges, or None if none apply."""
+    complete_through = get_author_sketch_complete_through()
+    if complete_through is None:
+        return None
+    split = _split_full_days(start_date, end_date, complete_through, time_column="tweet_timestamp")
+    if split is None:
+        return None
+    day_conditions, edge_condition, params = split
+    params.update(_window_conditions(start_date, end_date, "tweet_timestamp")[1])
+    return day_conditions, edge_condition, params
+
+def approximate_unique_authors(start_date=None, end_date=None):
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY DATE(tstp)
-    ORDER BY date
+    Estimate distinct llm_tweets authors in a window by merging daily sketches.
+
+    Authors from partial edge days and days not yet sketched are read raw and added
+    to the merged sketch, so the window boundaries are exact.
+
+    Returns:
+        int: The estimate, or None when no sketched day falls inside the window
     """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    split = _author_sketch_split(start_date, end_date)
+    if split is None:
+        return None
+    day_conditions, edge_condition, params = split
+    sketch = HyperLogLog()
+    with get_db_connection().connect() as connection:
+        for data in connection.execute(
+            text(f"SELECT sketch FROM {AUTHOR_SKETCH_TABLE}{_where(day_conditions)}"), params
+        ).scalars():
+            sketch.merge(HyperLogLog.from_bytes(data))
+        sketch.update(connection.execute(
+            text(f"SELECT DISTINCT author FROM llm_tweets{_where([edge_condition])}"), params
+        ).scalars())
+    return sketch.count()
 
-@st.cache_data(ttl=3600)
-def load_tweet_analysis(start_date=None, end_date=None) -> pd.DataFrame:
-    """Load tweet analysis results with optional date filtering."""
-    query = "SELECT * FROM tweet_analysis"
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY tstp DESC"
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
-
-@st.cache_data(ttl=3600)
-def get_tweet_stats(start_date=None, end_date=None) -> pd.DataFrame:
-    """Get high-level tweet statistics."""
-    query = """
-    SELECT 
-        COUNT(*) as total_tweets,
-        COUNT(DISTINCT author) as unique_authors,
-        SUM(CASE WHEN has_media THEN 1 ELSE 0 END) as tweets_with_media,
-        SUM(CASE WHEN is_verified THEN 1 ELSE 0 END) as verified_authors,
-        AVG(reply_count) as avg_replies,
-        AVG(repost_count) as avg_reposts,
-        AVG(like_count) as avg_likes,
-        AVG(view_count) as avg_views,
-        AVG(bookmark_count) as avg_bookmarks
-    FROM llm_tweets
+def _tweet_stats_query(start_date=None, end_date=None, count_authors=True):
+    """Build the query behind get_tweet_stats; count_authors=False leaves unique_authors NULL."""
+    authors_sql = "COUNT(DISTINCT author)" if count_authors else "NULL"
+    return build_query(
+        f"""
+        SELECT 
+            COUNT(*) as total_tweets,
+            {authors_sql} as unique_authors,
+            SUM(CASE WHEN has_media THEN 1 ELSE 0 END) as tweets_with_media,
+            SUM(CASE WHEN is_verified THEN 1 ELSE 0 END) as verified_authors,
+            AVG(reply_count) as avg_replies,
+            AVG(repost_count) as avg_reposts,
+            AVG(like_count) as avg_likes,
+            AVG(view_count) as avg_views,
+            AVG(bookmark_count) as avg_bookmarks
+        FROM llm_tweets
+        """,
+        start_date,
+        end_date,
+        time_column="tweet_timestamp",
+    )
+
+@cached_loader(ttl=3600, probe=table_probe("llm_tweets", AUTHOR_SKETCH_TABLE))
+def get_tweet_stats(start_date=None, end_date=None, approximate=False) -> pd.DataFrame:
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tweet_timestamp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tweet_timestamp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
-
-@st.cache_data(ttl=3600)
-def get_daily_tweet_stats(start_date=None, end_date=None) -> pd.DataFrame:
-    """Get daily tweet statistics."""
-    query = """
-    SELECT 
-        DATE(tweet_timestamp) as date,
-        COUNT(*) as tweet_count,
-        COUNT(DISTINCT author) as unique_authors,
-        SUM(reply_count) as total_replies,
-        SUM(repost_count) as total_reposts,
-        SUM(like_count) as total_likes,
-        SUM(view_count) as total_views
-    FROM llm_tweets
+    Get high-level tweet statistics.
+
+    With approximate=True, unique_authors is estimated from the daily author
+    sketches instead of COUNT(DISTINCT author); falls back to the exact count when
+    no sketches cover the window.
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tweet_timestamp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tweet_timestamp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY DATE(tweet_timestamp)
-    ORDER BY date
+    if approximate:
+        unique_authors = approximate_unique_authors(start_date, end_date)
+        if unique_authors is not None:
+            stats = read_query(*_tweet_stats_query(start_date, end_date, count_authors=False))
+            stats["unique_authors"] = unique_authors
+            return stats
+    return read_query(*_tweet_stats_query(start_date, end_date))
+
+def _daily_tweet_stats_query(start_date=None, end_date=None, approximate=False):
     """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    Build the query behind get_daily_tweet_stats.
+
+    With approximate=True, sketched days take unique_authors from the sketch table's
+    stored per-day count and only the remaining days run COUNT(DISTINCT author).
+    """
+    split = _author_sketch_split(start_date, end_date) if approximate else None
+    if split is None:
+        return build_query(
+            """
+            SELECT 
+                DATE(tweet_timestamp) as date,
+                COUNT(*) as tweet_count,
+                COUNT(DISTINCT author) as unique_authors,
+                SUM(reply_count) as total_replies,
+                SUM(repost_count) as total_reposts,
+                SUM(like_count) as total_likes,
+                SUM(view_count) as total_views
+            FROM llm_tweets
+            """,
+            start_date,
+            end_date,
+            time_column="tweet_timestamp",
+            suffix="""
+            GROUP BY DATE(tweet_timestamp)
+            ORDER BY date
+            """,
+        )
+
+    day_conditions, edge_condition, params = split
+    window_conditions, _ = _window_conditions(start_date, end_date, "tweet_timestamp")
+    return text(f"""
+        SELECT 
+            daily.date,
+            daily.tweet_count,
+            COALESCE(sketches.authors, daily.edge_authors) as unique_authors,
+            daily.total_replies,
+            daily.total_reposts,
+            daily.total_likes,
+            daily.total_views
+        FROM (
+            SELECT 
+                DATE(tweet_timestamp) as date,
+                COUNT(*) as tweet_count,
+                COUNT(DISTINCT author) FILTER (WHERE {edge_condition}) as edge_authors,
+                SUM(reply_count) as total_replies,
+                SUM(repost_count) as total_reposts,
+                SUM(like_count) as total_likes,
+                SUM(view_count) as total_views
+            FROM llm_tweets{_where(window_conditions)}
+            GROUP BY DATE(tweet_timestamp)
+        ) AS daily
+        LEFT JOIN (
+            SELECT date, authors FROM {AUTHOR_SKETCH_TABLE}{_where(day_conditions)}
+        ) AS sketches ON sketches.date = daily.date
+        ORDER BY daily.date
+    """), params
+
+@cached_loader(ttl=3600, probe=table_probe("llm_tweets", AUTHOR_SKETCH_TABLE))
+def get_daily_tweet_stats(start_date=None, end_date=None, approximate=False) -> pd.DataFrame:
+    """Get daily tweet statistics; approximate=True reads per-day author counts from the sketch table."""
+    return read_query(*_daily_tweet_stats_query(start_date, end_date, approximate))
+
+def _top_authors_query(limit: int = 10, start_date=None, end_date=None):
+    """Build the query behind get_top_authors."""
+    return build_query(
+        """
+        SELECT 
+            author,
+            username,
+            COUNT(*) as tweet_count,
+            SUM(reply_count) as total_replies,
+            SUM(repost_count) as total_reposts,
+            SUM(like_count) as total_likes,
+            SUM(view_count) as total_views,
+            BOOL_OR(is_verified) as is_verified
+        FROM llm_tweets
+        """,
+        start_date,
+        end_date,
+        time_column="tweet_timestamp",
+        suffix="""
+        GROUP BY author, username
+        ORDER BY total_likes DESC
+        LIMIT :limit
+        """,
+        params={"limit": int(limit)},
+    )
 
-@st.cache_data(ttl=3600)
+@cached_loader(ttl=3600, probe=table_probe("llm_tweets"))
 def get_top_authors(limit: int = 10, start_date=None, end_date=None) -> pd.DataFrame:
     """Get most active authors based on engagement metrics."""
-    query = """
-    SELECT 
-        author,
-        username,
-        COUNT(*) as tweet_count,
-        SUM(reply_count) as total_replies,
-        SUM(repost_count) as total_reposts,
-        SUM(like_count) as total_likes,
-        SUM(view_count) as total_views,
-        BOOL_OR(is_verified) as is_verified
-    FROM llm_tweets
+    return read_query(*_top_authors_query(limit, start_date, end_date))
+
+TWEET_REPLY_COLUMNS = """
+            id, 
+            tstp, 
+            selected_tweet, 
+            response, 
+            meta_data,
+            approval_status"""
+
+def _pending_tweet_replies_query(limit=10, before=None):
+    """Build the query behind get_pending_tweet_replies."""
+    conditions = ["approval_status = 'pending'"]
+    params = {"limit": int(limit)}
+    if before is not None:
+        # Row comparison lets Postgres seek in the pending (tstp, id) index instead of skipping rows
+        conditions.append("(tstp, id) < (:before_tstp, :before_id)")
+        params["before_tstp"], params["before_id"] = before[0], int(before[1])
+    return build_query(
+        f"""
+        SELECT {TWEET_REPLY_COLUMNS}
+        FROM tweet_replies
+        """,
+        conditions=conditions,
+        suffix="""
+        ORDER BY tstp DESC, id DESC
+        LIMIT :limit
+        """,
+        params=params,
+    )
+
+@cached_loader(ttl=600)
+def get_pending_tweet_replies(limit=10, before=None, version=None):
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tweet_timestamp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tweet_timestamp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY author, username
-    ORDER BY total_likes DESC
-    LIMIT %d
-    """ % limit
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
-
-def get_pending_tweet_replies(limit=10):
-    """Load pending tweet replies for approval."""
-    query = f"""
-    SELECT 
-        id, 
-        tstp, 
-        selected_tweet, 
-        response, 
-        meta_data,
-        approval_status
-    FROM tweet_replies
-    WHERE approval_status = 'pending'
-    ORDER BY tstp DESC
-    LIMIT {limit}
+    Load pending tweet replies for approval, newest first.
+
+    Args:
+        limit: Page size
+        before: Optional (tstp, id) keyset cursor; returns the page after that row.
+            Pass pending_replies_cursor() of the previous page to continue.
+        version: get_table_version("tweet_replies"); only part of the cache key
     """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    return read_query(*_pending_tweet_replies_query(limit, before))
+
+def pending_replies_cursor(page):
+    """Return the keyset cursor after the last row of a get_pending_tweet_replies page."""
+    if page.empty:
+        return None
+    last = page.iloc[-1]
+    return pd.Timestamp(last["tstp"]).to_pydatetime(), int(last["id"])
+
+@cached_loader(ttl=600)
+def count_pending_tweet_replies(version=None):
+    """Count tweet replies waiting for approval."""
+    statement, params = build_query(
+        "SELECT COUNT(*) as count FROM tweet_replies", conditions=["approval_status = 'pending'"]
+    )
+    return int(read_query(statement, params)["count"].iloc[0])
 
+@cached_loader(ttl=600)
+def get_tweet_reply_by_id(tweet_id, version=None):
+    """Load a single tweet reply (any status); returns an empty frame if it does not exist."""
+    statement, params = build_query(
+        f"""
+        SELECT {TWEET_REPLY_COLUMNS}
+        FROM tweet_replies
+        """,
+        conditions=["id = :tweet_id"],
+        params={"tweet_id": int(tweet_id)},
+    )
+    return read_query(statement, params)
+
+@instrumentation.instrumented
 def update_tweet_reply_status(tweet_id, status):
     """Update the status of a tweet reply."""
     if status not in ['approved', 'rejected']:
@@ -451,11 +1207,13 @@ def update_tweet_reply_status(tweet_id, status):
                 """)
             result = connection.execute(query, {"status": status, "tweet_id": tweet_id})
             connection.commit()
+            notifications.mark_written("tweet_replies")
             return True
     except Exception as e:
         print(f"Error updating tweet reply status: {e}")
         return False
 
+@instrumentation.instrumented
 def update_tweet_reply_text_and_status(tweet_id, new_text, status='approved'):
     """Update both the response text and status of a tweet reply."""
     if status not in ['approved', 'rejected']:
@@ -473,11 +1231,13 @@ def update_tweet_reply_text_and_status(tweet_id, new_text, status='approved'):
                 """)
             result = connection.execute(query, {"status": status, "new_text": new_text, "tweet_id": tweet_id})
             connection.commit()
+            notifications.mark_written("tweet_replies")
             return True
     except Exception as e:
         print(f"Error updating tweet reply text and status: {e}")
         return False
 
+@instrumentation.instrumented
 def delete_tweet_reply(tweet_id):
     """Delete a tweet reply from the database."""
     try:
@@ -489,207 +1249,181 @@ def delete_tweet_reply(tweet_id):
                 """)
             result = connection.execute(query, {"tweet_id": tweet_id})
             connection.commit()
+            notifications.mark_written("tweet_replies")
             return True
     except Exception as e:
         print(f"Error deleting tweet reply: {e}")
         return False
 
-@st.cache_data(ttl=3600)
-def load_poll_results(start_date=None, end_date=None):
-    """Load poll results, aggregated by day and feature_name, with optional date filtering"""
-    query = """
-    SELECT 
-        DATE(tstp) as date,
-        feature_name,
-        COUNT(*) as vote_count
-    FROM feature_poll_votes
+@instrumentation.instrumented
+def review_tweet_replies(approved=(), rejected=(), deleted=(), edited=None):
     """
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += """
-    GROUP BY DATE(tstp), feature_name
-    ORDER BY date, feature_name
-    """
-    
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    Apply a batch of review decisions to tweet replies in one transaction.
 
-@st.cache_data(ttl=3600)
-def get_daily_cost_stats_grouped(start_date=None, end_date=None, group_by="token_type"):
-    """
-    Get daily cost statistics grouped by different dimensions.
-    
     Args:
-        start_date: Optional start date filter
-        end_date: Optional end date filter  
-        group_by: Grouping dimension - "token_type", "model", or "process"
-        
+        approved: Reply ids to approve
+        rejected: Reply ids to reject
+        deleted: Reply ids to delete
+        edited: Optional dict of reply id -> new response text; these are approved with the new text
+
     Returns:
-        DataFrame with columns: date, category, prompt_cost, completion_cost, 
-        cache_creation_cost, cache_read_cost, total_cost, total_runs
+        dict: Rows affected per action, or None if the batch failed (nothing is applied)
     """
-    if group_by == "token_type":
-        # Return the existing token type structure - unpivoted for consistency
-        query = """
-        SELECT 
-            DATE(tstp) as date,
-            'Prompt' as category,
-            SUM(prompt_cost) as cost,
-            COUNT(*) as runs
-        FROM token_usage_logs
-        """
-        conditions = []
-        
-        if start_date:
-            conditions.append(f"tstp >= '{start_date}'")
-        if end_date:
-            conditions.append(f"tstp <= '{end_date}'")
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += """
-        GROUP BY DATE(tstp)
-        UNION ALL
-        SELECT 
-            DATE(tstp) as date,
-            'Completion' as category,
-            SUM(completion_cost) as cost,
-            COUNT(*) as runs
-        FROM token_usage_logs
+    edited = edited or {}
+    approved = [int(tweet_id) for tweet_id in approved if tweet_id not in edited]
+    rejected = [int(tweet_id) for tweet_id in rejected]
+    deleted = [int(tweet_id) for tweet_id in deleted]
+    counts = {"approved": 0, "rejected": 0, "edited": 0, "deleted": 0}
+    
+    try:
+        conn = get_db_connection()
+        with conn.begin() as connection:
+            status_query = text("""
+                UPDATE tweet_replies
+                SET approval_status = :status,
+                    tstp = NOW()
+                WHERE id = ANY(:tweet_ids)
+                """)
+            for status, tweet_ids in (("approved", approved), ("rejected", rejected)):
+                if tweet_ids:
+                    result = connection.execute(status_query, {"status": status, "tweet_ids": tweet_ids})
+                    counts[status] = result.rowcount
+            if edited:
+                result = connection.execute(
+                    text("""
+                        UPDATE tweet_replies
+                        SET approval_status = 'approved',
+                            response = :new_text,
+                            tstp = NOW()
+                        WHERE id = :tweet_id
+                        """),
+                    [{"tweet_id": int(tweet_id), "new_text": new_text} for tweet_id, new_text in edited.items()],
+                )
+                counts["edited"] = result.rowcount
+            if deleted:
+                result = connection.execute(
+                    text("DELETE FROM tweet_replies WHERE id = ANY(:tweet_ids)"),
+                    {"tweet_ids": deleted},
+                )
+                counts["deleted"] = result.rowcount
+        notifications.mark_written("tweet_replies")
+        return counts
+    except Exception as e:
+        print(f"Error applying tweet reply review batch: {e}")
+        return None
+
+def _poll_results_query(start_date=None, end_date=None):
+    """Build the query behind load_poll_results."""
+    return build_query(
         """
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += """
-        GROUP BY DATE(tstp)
-        UNION ALL
         SELECT 
             DATE(tstp) as date,
-            'Cache Creation' as category,
-            SUM(cache_creation_cost) as cost,
-            COUNT(*) as runs
-        FROM token_usage_logs
-        """
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += """
-        GROUP BY DATE(tstp)
-        UNION ALL
+            feature_name,
+            COUNT(*) as vote_count
+        FROM feature_poll_votes
+        """,
+        start_date,
+        end_date,
+        suffix="""
+        GROUP BY DATE(tstp), feature_name
+        ORDER BY date, feature_name
+        """,
+    )
+
+@cached_loader(ttl=3600, probe=table_probe("feature_poll_votes"))
+def load_poll_results(start_date=None, end_date=None):
+    """Load poll results, aggregated by day and feature_name, with optional date filtering"""
+    return read_query(*_poll_results_query(start_date, end_date))
+
+# Token type categories and the daily usage columns they unpivot from, per metric
+TOKEN_TYPE_COLUMNS = {
+    "cost": [
+        ("Prompt", "prompt_cost"),
+        ("Completion", "completion_cost"),
+        ("Cache Creation", "cache_creation_cost"),
+        ("Cache Read", "cache_read_cost"),
+    ],
+    "tokens": [
+        ("Prompt", "prompt_tokens"),
+        ("Completion", "completion_tokens"),
+        ("Cache Creation", "cache_creation_input_tokens"),
+        ("Cache Read", "cache_read_input_tokens"),
+    ],
+}
+
+def _daily_cost_grouped_query(start_date=None, end_date=None, group_by="token_type", metric="cost"):
+    """Build the grouped daily cost/token query; every grouping reads the usage source once."""
+    if metric not in TOKEN_TYPE_COLUMNS:
+        raise ValueError(f"Unknown metric: {metric}")
+    source, params = daily_usage_source(start_date, end_date)
+
+    if group_by == "token_type":
+        # Unpivot all four token types from the same row instead of one scan per type
+        values = ", ".join(f"('{category}', usage.{column})" for category, column in TOKEN_TYPE_COLUMNS[metric])
+        query = f"""
         SELECT 
-            DATE(tstp) as date,
-            'Cache Read' as category,
-            SUM(cache_read_cost) as cost,
-            COUNT(*) as runs
-        FROM token_usage_logs
-        """
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += """
-        GROUP BY DATE(tstp)
+            usage.date,
+            token_type.category,
+            SUM(token_type.value) as {metric},
+            SUM(usage.total_runs) as runs
+        FROM ({source}) AS usage
+        CROSS JOIN LATERAL (VALUES {values}) AS token_type(category, value)
+        GROUP BY usage.date, token_type.category
         ORDER BY date, category
         """
-        
-    elif group_by == "model":
-        query = """
-        SELECT 
-            DATE(tstp) as date,
-            model_name as category,
-            SUM(prompt_cost + completion_cost + COALESCE(cache_creation_cost, 0) + COALESCE(cache_read_cost, 0)) as cost,
-            COUNT(*) as runs
-        FROM token_usage_logs
-        """
-        conditions = []
-        
-        if start_date:
-            conditions.append(f"tstp >= '{start_date}'")
-        if end_date:
-            conditions.append(f"tstp <= '{end_date}'")
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += """
-        GROUP BY DATE(tstp), model_name
-        ORDER BY date, model_name
-        """
-        
-    elif group_by == "process":
-        query = """
+
+    elif group_by in ("model", "process"):
+        column = "model_name" if group_by == "model" else "process_id"
+        if metric == "cost":
+            value_sql = "SUM(total_cost)"
+        else:
+            value_sql = " + ".join(f"COALESCE(SUM({column_name}), 0)" for _, column_name in TOKEN_TYPE_COLUMNS["tokens"])
+        query = f"""
         SELECT 
-            DATE(tstp) as date,
-            process_id as category,
-            SUM(prompt_cost + completion_cost + COALESCE(cache_creation_cost, 0) + COALESCE(cache_read_cost, 0)) as cost,
-            COUNT(*) as runs
-        FROM token_usage_logs
-        """
-        conditions = []
-        
-        if start_date:
-            conditions.append(f"tstp >= '{start_date}'")
-        if end_date:
-            conditions.append(f"tstp <= '{end_date}'")
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += """
-        GROUP BY DATE(tstp), process_id
-        ORDER BY date, process_id
+            date,
+            {column} as category,
+            {value_sql} as {metric},
+            SUM(total_runs) as runs
+        FROM ({source}) AS usage
+        GROUP BY date, {column}
+        ORDER BY date, {column}
         """
+
+    else:
+        raise ValueError(f"Unknown group_by: {group_by}")
+
+    return text(query), params
+
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
+def get_daily_cost_stats_grouped(start_date=None, end_date=None, group_by="token_type", metric="cost"):
+    """
+    Get daily cost or token statistics grouped by different dimensions.
     
-    conn = get_db_connection()
-    return pd.read_sql(query, conn)
+    Args:
+        start_date: Optional start date filter
+        end_date: Optional end date filter  
+        group_by: Grouping dimension - "token_type", "model", or "process"
+        metric: "cost" or "tokens"
+        
+    Returns:
+        DataFrame with columns: date, category, cost (or tokens), runs
+    """
+    return read_query(*_daily_cost_grouped_query(start_date, end_date, group_by, metric))
 
-@st.cache_data(ttl=3600)
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
 def get_available_models(start_date=None, end_date=None):
     """Get list of available models in the date range."""
-    query = "SELECT DISTINCT model_name FROM token_usage_logs"
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-    
-    query += " ORDER BY model_name"
-    
-    conn = get_db_connection()
-    result = pd.read_sql(query, conn)
+    source, params = daily_usage_source(start_date, end_date)
+    result = read_query(text(f"SELECT DISTINCT model_name FROM ({source}) AS usage ORDER BY model_name"), params)
     return result["model_name"].tolist()
 
-@st.cache_data(ttl=3600)
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
 def get_available_processes(start_date=None, end_date=None):
     """Get list of available processes in the date range."""
-    query = "SELECT DISTINCT process_id FROM token_usage_logs WHERE process_id IS NOT NULL"
-    conditions = []
-    
-    if start_date:
-        conditions.append(f"tstp >= '{start_date}'")
-    if end_date:
-        conditions.append(f"tstp <= '{end_date}'")
-    
-    if conditions:
-        query += " AND " + " AND ".join(conditions)
-    
-    query += " ORDER BY process_id"
-    
-    conn = get_db_connection()
-    result = pd.read_sql(query, conn)
-    return result["process_id"].tolist() 
\ No newline at end of file
+    source, params = daily_usage_source(start_date, end_date)
+    result = read_query(text(f"""
+        SELECT DISTINCT process_id FROM ({source}) AS usage
+        WHERE process_id IS NOT NULL
+        ORDER BY process_id
+    """), params)
+    return result["process_id"].tolist()
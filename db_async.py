@@ -0,0 +1,190 @@
+"""Asyncio counterpart to the aggregate loaders in db.py, built on asyncpg.
+
+Each coroutine takes the same arguments as its db.py namesake and runs the exact
+statement db.py builds, so results match column for column. Pages call
+gather_page_data to run many of them at once over one shared asyncpg pool, which
+lives on a single background event loop per process; no thread is spawned per
+query or per session.
+"""
+import asyncio
+import json
+import threading
+import pandas as pd
+import asyncpg
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+from db import (
+    db_params,
+    get_pool_settings,
+    _top_entrypoints_query,
+    _hourly_stats_query,
+    _daily_stats_query,
+    _tweet_analysis_query,
+    _tweet_stats_query,
+    _daily_tweet_stats_query,
+    _top_authors_query,
+    _poll_results_query,
+    _usage_stats_query,
+    _daily_cost_stats_query,
+    _daily_cost_grouped_query,
+    approximate_unique_authors,
+)
+
+# Compiles db.py's named :params into asyncpg's positional $1, $2, ...
+_DIALECT = PGDialect_asyncpg(paramstyle="numeric_dollar")
+
+# Upper bound for gather_page_data when the caller gives no timeout
+DEFAULT_GATHER_TIMEOUT = 120
+
+_loop = None
+_loop_lock = threading.Lock()
+_pool = None
+_pool_lock = None
+
+def _get_loop():
+    """Return the process-wide event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="db-async-loop", daemon=True).start()
+    return _loop
+
+async def _init_connection(connection):
+    # Decode JSON columns to Python objects, as psycopg2 does for the sync loaders
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+async def get_pool():
+    """Create (once) and return the asyncpg pool, sized like the SQLAlchemy engine."""
+    global _pool, _pool_lock
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            settings = get_pool_settings()
+            server_settings = {}
+            if settings["statement_timeout_ms"] > 0:
+                server_settings["statement_timeout"] = str(settings["statement_timeout_ms"])
+            _pool = await asyncpg.create_pool(
+                user=db_params["user"],
+                password=db_params["password"],
+                host=db_params["host"],
+                port=int(db_params["port"]),
+                database=db_params["dbname"],
+                min_size=1,
+                max_size=settings["pool_size"],
+                max_inactive_connection_lifetime=settings["pool_recycle"],
+                server_settings=server_settings,
+                init=_init_connection,
+            )
+    return _pool
+
+def compile_query(statement, params=None):
+    """Compile a SQLAlchemy text() statement to asyncpg SQL and positional arguments."""
+    compiled = statement.compile(dialect=_DIALECT)
+    values = compiled.construct_params(params or {})
+    return compiled.string, [values[name] for name in compiled.positiontup]
+
+async def read_query(statement, params=None):
+    """Async read_query: run a statement as a prepared statement and return a DataFrame."""
+    sql, args = compile_query(statement, params)
+    pool = await get_pool()
+    async with pool.acquire() as connection:
+        # asyncpg keeps prepared statements in a per-connection cache, so repeat
+        # page loads skip parsing and planning
+        prepared = await connection.prepare(sql)
+        rows = await prepared.fetch(*args)
+        columns = [attribute.name for attribute in prepared.get_attributes()]
+    # Match pd.read_sql, which turns NUMERIC (Decimal) values into floats
+    return pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns, coerce_float=True)
+
+async def _read_stateful_query(builder, *args):
+    # Rollup and sketch builders consult cached watermarks through the sync engine,
+    # so build them off the event loop
+    return await read_query(*await asyncio.to_thread(builder, *args))
+
+async def get_top_entrypoints(limit=10, start_date=None, end_date=None):
+    """Get the most common entrypoints"""
+    return await read_query(*_top_entrypoints_query(limit, start_date, end_date))
+
+async def get_hourly_stats(table_name, start_date=None, end_date=None):
+    """Get hourly statistics for any of the log tables"""
+    return await read_query(*_hourly_stats_query(table_name, start_date, end_date))
+
+async def get_daily_stats(table_name, start_date=None, end_date=None):
+    """Get daily statistics for any of the log tables"""
+    return await read_query(*_daily_stats_query(table_name, start_date, end_date))
+
+async def load_tweet_analysis(start_date=None, end_date=None, columns=None) -> pd.DataFrame:
+    """Load tweet analysis results with optional date filtering and column projection."""
+    return await read_query(*_tweet_analysis_query(start_date, end_date, columns))
+
+async def get_tweet_stats(start_date=None, end_date=None, approximate=False) -> pd.DataFrame:
+    """Get high-level tweet statistics; approximate=True estimates unique_authors from daily sketches."""
+    if approximate:
+        unique_authors = await asyncio.to_thread(approximate_unique_authors, start_date, end_date)
+        if unique_authors is not None:
+            stats = await read_query(*_tweet_stats_query(start_date, end_date, count_authors=False))
+            stats["unique_authors"] = unique_authors
+            return stats
+    return await read_query(*_tweet_stats_query(start_date, end_date))
+
+async def get_daily_tweet_stats(start_date=None, end_date=None, approximate=False) -> pd.DataFrame:
+    """Get daily tweet statistics; approximate=True reads per-day author counts from the sketch table."""
+    if approximate:
+        return await _read_stateful_query(_daily_tweet_stats_query, start_date, end_date, True)
+    return await read_query(*_daily_tweet_stats_query(start_date, end_date))
+
+async def get_top_authors(limit: int = 10, start_date=None, end_date=None) -> pd.DataFrame:
+    """Get most active authors based on engagement metrics."""
+    return await read_query(*_top_authors_query(limit, start_date, end_date))
+
+async def load_poll_results(start_date=None, end_date=None):
+    """Load poll results, aggregated by day and feature_name, with optional date filtering"""
+    return await read_query(*_poll_results_query(start_date, end_date))
+
+async def get_model_stats(start_date=None, end_date=None):
+    """Get aggregated stats per model."""
+    return await _read_stateful_query(_usage_stats_query, "model_name", start_date, end_date)
+
+async def get_process_stats(start_date=None, end_date=None):
+    """Get aggregated stats per process."""
+    return await _read_stateful_query(_usage_stats_query, "process_id", start_date, end_date)
+
+async def get_daily_cost_stats(start_date=None, end_date=None):
+    """Get daily cost statistics."""
+    return await _read_stateful_query(_daily_cost_stats_query, start_date, end_date)
+
+async def get_daily_cost_stats_grouped(start_date=None, end_date=None, group_by="token_type", metric="cost"):
+    """Get daily cost or token statistics grouped by token type, model, or process."""
+    return await _read_stateful_query(_daily_cost_grouped_query, start_date, end_date, group_by, metric)
+
+async def _gather(tasks):
+    results = await asyncio.gather(
+        *(loader(**kwargs) for loader, kwargs in tasks.values()), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return dict(zip(tasks, results))
+
+def gather_page_data(tasks, timeout=DEFAULT_GATHER_TIMEOUT):
+    """
+    Run several async loaders concurrently and return their results by name.
+
+    Safe to call from Streamlit script code: the coroutines run on the background
+    event loop while the calling thread waits.
+
+    Args:
+        tasks: Dict mapping a result name to a (coroutine function, kwargs) tuple,
+            the same shape load_concurrently takes
+        timeout: Seconds to wait for the whole batch
+
+    Returns:
+        dict: Result of each loader under its task name. If any loader raises, the
+        first error (in task order) is re-raised after all calls finish.
+    """
+    if not tasks:
+        return {}
+    future = asyncio.run_coroutine_threadsafe(_gather(tasks), _get_loop())
+    return future.result(timeout)
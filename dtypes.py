@@ -0,0 +1,97 @@
+"""Compact column dtypes for the frames the loaders return.
+
+Cached frames are pickled into st.cache_data and copied out on every call, so
+narrower dtypes shrink both the cache and each session's copy. Each loader names a
+schema in FRAME_SCHEMAS; compact_frame applies it and records before/after memory.
+"""
+import threading
+import pandas as pd
+
+# A string column is stored as a categorical only if it has at most this share of distinct values
+MAX_CATEGORY_RATIO = 0.5
+
+TOKEN_COLUMNS = ["prompt_tokens", "completion_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"]
+COST_COLUMNS = ["prompt_cost", "completion_cost", "cache_creation_cost", "cache_read_cost"]
+ANALYTICS_COUNT_COLUMNS = [
+    "Impressions", "Likes", "Engagements", "Bookmarks", "Share", "New follows", "Replies",
+    "Reposts", "Profile visits", "Detail expands", "Url clicks", "Hashtag clicks", "Permalink clicks",
+]
+
+# Per-loader plan: low-cardinality strings -> category, counts -> smallest safe integer,
+# per-row costs -> float32 (sub-cent precision is kept well beyond what the pages display)
+FRAME_SCHEMAS = {
+    "token_usage_logs": {
+        "category": ["model_name", "process_id"],
+        "integer": ["id"] + TOKEN_COLUMNS,
+        "float32": COST_COLUMNS,
+    },
+    "token_usage_daily": {
+        "category": ["model_name", "process_id"],
+        "integer": ["total_runs"] + TOKEN_COLUMNS,
+    },
+    "visit_logs": {
+        "category": ["entrypoint"],
+        "integer": ["id"],
+    },
+    "tweet_analytics": {
+        "category": ["tweet_type"],
+        "integer": ANALYTICS_COUNT_COLUMNS,
+    },
+}
+
+_memory_report = {}
+_memory_report_lock = threading.Lock()
+
+def _to_category(series):
+    if series.dtype != object:
+        return series
+    if series.nunique(dropna=True) > MAX_CATEGORY_RATIO * max(len(series), 1):
+        return series
+    return series.astype("category")
+
+def _to_smallest_integer(series):
+    """Downcast whole-number columns; columns with nulls use the nullable Int dtypes."""
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series
+    values = series.dropna()
+    if values.empty or not (values % 1 == 0).all():
+        return series
+    dtype = pd.to_numeric(values, downcast="integer").dtype
+    if len(values) < len(series):
+        return series.astype(dtype.name.capitalize())
+    return series.astype(dtype)
+
+def _to_float32(series):
+    if series.dtype == object:
+        series = pd.to_numeric(series)
+    if not pd.api.types.is_float_dtype(series):
+        return series
+    return series.astype("float32")
+
+def compact_frame(frame, schema):
+    """
+    Return a copy of frame with the named schema's dtypes applied.
+
+    Columns the schema lists but the frame lacks (e.g. after column projection) are
+    skipped, and before/after memory is recorded for get_memory_report.
+    """
+    plan = FRAME_SCHEMAS[schema]
+    before = frame.memory_usage(deep=True).sum()
+    frame = frame.copy(deep=False)
+    for kind, convert in (("category", _to_category), ("integer", _to_smallest_integer), ("float32", _to_float32)):
+        for column in plan.get(kind, []):
+            if column in frame.columns:
+                frame[column] = convert(frame[column])
+    after = frame.memory_usage(deep=True).sum()
+    with _memory_report_lock:
+        _memory_report[schema] = {"rows": len(frame), "before_mb": before / 1e6, "after_mb": after / 1e6}
+    return frame
+
+def get_memory_report():
+    """Return the latest before/after memory per schema as a DataFrame."""
+    with _memory_report_lock:
+        report = pd.DataFrame.from_dict(_memory_report, orient="index")
+    if report.empty:
+        return report
+    report["saved"] = 1 - report["after_mb"] / report["before_mb"].where(report["before_mb"] > 0)
+    return report
@@ -0,0 +1,183 @@
+"""Per-call timing for the data loaders, kept in an in-process ring buffer.
+
+Every cached loader (via caching.cached_loader) and every uncached loader wrapped
+with @instrumented records one entry per call: wall time, time spent in the
+database, rows and DataFrame memory returned, cache hit/miss and the SQL it ran.
+Set INSTRUMENTATION_SQLITE to a file path to also persist entries across restarts.
+"""
+import functools
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+RING_BUFFER_SIZE = int(os.environ.get("INSTRUMENTATION_BUFFER_SIZE", 2000))
+SQLITE_PATH = os.environ.get("INSTRUMENTATION_SQLITE")
+
+# Statements kept per call, and characters kept per statement
+MAX_STATEMENTS = 5
+MAX_SQL_CHARS = 4000
+
+RECORD_COLUMNS = ["tstp", "loader", "cache", "wall_ms", "db_ms", "queries", "rows", "bytes", "error", "sql"]
+
+_records = deque(maxlen=RING_BUFFER_SIZE)
+_records_lock = threading.Lock()
+_local = threading.local()
+_sqlite = None
+_sqlite_lock = threading.Lock()
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+def _measure(result, measure_bytes):
+    """Return (rows, bytes) for a DataFrame, a dict of DataFrames, or a list."""
+    if isinstance(result, pd.DataFrame):
+        frames = [result]
+    elif isinstance(result, dict):
+        frames = [value for value in result.values() if isinstance(value, pd.DataFrame)]
+    elif isinstance(result, (list, tuple)):
+        return len(result), None
+    else:
+        return None, None
+    if not frames:
+        return None, None
+    rows = sum(len(frame) for frame in frames)
+    # Deep memory walks every string, so it is only measured when data was actually fetched
+    size = int(sum(frame.memory_usage(deep=True).sum() for frame in frames)) if measure_bytes else None
+    return rows, size
+
+def _persist(record):
+    global _sqlite, SQLITE_PATH
+    with _sqlite_lock:
+        try:
+            if _sqlite is None:
+                _sqlite = sqlite3.connect(SQLITE_PATH, check_same_thread=False)
+                _sqlite.execute(
+                    "CREATE TABLE IF NOT EXISTS loader_calls ("
+                    "tstp TEXT, loader TEXT, cache TEXT, wall_ms REAL, db_ms REAL, queries INTEGER, "
+                    "rows INTEGER, bytes INTEGER, error TEXT, sql TEXT)"
+                )
+            _sqlite.execute(
+                f"INSERT INTO loader_calls ({', '.join(RECORD_COLUMNS)}) VALUES ({', '.join('?' * len(RECORD_COLUMNS))})",
+                [record[column].isoformat() if column == "tstp" else record[column] for column in RECORD_COLUMNS],
+            )
+            _sqlite.commit()
+        except sqlite3.Error as e:
+            # Never let diagnostics break a page; keep the in-memory buffer only
+            print(f"Disabling instrumentation persistence: {e}")
+            SQLITE_PATH = None
+
+@contextmanager
+def track(loader, cache=None):
+    """
+    Record one loader call.
+
+    Args:
+        loader: Name shown on the Diagnostics page
+        cache: "hit" for cached loaders (switched to "miss" by mark_miss), None if uncached
+
+    Yields:
+        dict: The in-progress call; set call["result"] to have rows and memory measured
+    """
+    call = {"loader": loader, "cache": cache, "db_s": 0.0, "queries": 0, "statements": [], "result": None}
+    stack = _stack()
+    stack.append(call)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield call
+    except Exception as e:
+        error = repr(e)
+        raise
+    finally:
+        stack.pop()
+        rows, size = _measure(call["result"], call["cache"] != "hit")
+        record = {
+            "tstp": datetime.now(),
+            "loader": loader,
+            "cache": call["cache"],
+            "wall_ms": (time.perf_counter() - started) * 1000,
+            "db_ms": call["db_s"] * 1000,
+            "queries": call["queries"],
+            "rows": rows,
+            "bytes": size,
+            "error": error,
+            "sql": ";\n\n".join(call["statements"]) or None,
+        }
+        with _records_lock:
+            _records.append(record)
+        if SQLITE_PATH:
+            _persist(record)
+
+def mark_miss():
+    """Flag the innermost tracked call as a cache miss."""
+    stack = _stack()
+    if stack:
+        stack[-1]["cache"] = "miss"
+
+def record_sql(statement, seconds):
+    """Attribute one executed statement to every loader call active on this thread."""
+    for call in _stack():
+        call["db_s"] += seconds
+        call["queries"] += 1
+        if len(call["statements"]) < MAX_STATEMENTS:
+            call["statements"].append(" ".join(str(statement).split())[:MAX_SQL_CHARS])
+
+def instrumented(func):
+    """Record calls to an uncached loader or write path (e.g. the tweet reply updates)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with track(func.__name__) as call:
+            call["result"] = func(*args, **kwargs)
+        return call["result"]
+    return wrapper
+
+def attach_engine(engine):
+    """Time every statement the engine executes and credit it to the running loader."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        record_sql(statement, time.perf_counter() - connection.info["query_started"].pop())
+
+def get_records():
+    """Return the buffered calls, newest first, as a DataFrame."""
+    with _records_lock:
+        records = list(_records)
+    frame = pd.DataFrame(records[::-1], columns=RECORD_COLUMNS)
+    frame[["rows", "bytes"]] = frame[["rows", "bytes"]].astype(float)
+    return frame
+
+def get_loader_summary():
+    """Return per-loader call counts, cache hit rate and p50/p95 wall and DB time."""
+    records = get_records()
+    if records.empty:
+        return pd.DataFrame()
+    grouped = records.groupby("loader")
+    summary = pd.DataFrame({
+        "calls": grouped.size(),
+        "hit_rate": grouped["cache"].apply(lambda cache: (cache == "hit").sum() / cache.notna().sum() if cache.notna().any() else None),
+        "p50_ms": grouped["wall_ms"].quantile(0.5),
+        "p95_ms": grouped["wall_ms"].quantile(0.95),
+        "p50_db_ms": grouped["db_ms"].quantile(0.5),
+        "p95_db_ms": grouped["db_ms"].quantile(0.95),
+        "max_rows": grouped["rows"].max(),
+        "max_mb": grouped["bytes"].max() / 1e6,
+        "errors": grouped["error"].count(),
+    })
+    return summary.sort_values("p95_ms", ascending=False)
+
+def clear_records():
+    """Empty the in-memory buffer (the SQLite file, if any, is kept)."""
+    with _records_lock:
+        _records.clear()
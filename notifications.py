@@ -0,0 +1,205 @@
+"""Push change notifications from Postgres (LISTEN/NOTIFY) for tables the pages watch.
+
+A statement-level trigger on each watched table sends NOTIFY on the table's channel
+after every INSERT, UPDATE or DELETE. One listener thread per server process holds a
+dedicated connection LISTENing on those channels and bumps an in-process version per
+table; loaders take the version as an argument, so their cache key changes only when
+the table did. If the listener is down, or a table's trigger has not been installed,
+that table's version falls back to advancing every POLL_SECONDS, which is the old
+polling behaviour.
+
+Usage:
+    python notifications.py --install     # create the trigger functions and triggers
+"""
+import argparse
+import select
+import threading
+import time
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+# Watched table -> NOTIFY channel
+CHANNELS = {
+    "tweet_replies": "tweet_replies_changed",
+}
+
+# Version granularity while the listener is down; also the listener's keepalive interval
+POLL_SECONDS = 60
+RECONNECT_SECONDS = 5
+
+_versions = {table: 0 for table in CHANNELS}
+_state = {"connected": False, "error": None, "notifications": 0, "since": None, "triggered": set()}
+_lock = threading.Lock()
+_listener = None
+
+def trigger_ddl(table):
+    """Return the statements that make `table` NOTIFY its channel on every change."""
+    channel = CHANNELS[table]
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION notify_{channel}() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{channel}', TG_OP);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {channel}_trigger ON {table}",
+        f"""
+        CREATE TRIGGER {channel}_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_{channel}()
+        """,
+    ]
+
+TRIGGERS_SQL = """
+    SELECT tgname FROM pg_trigger
+    WHERE NOT tgisinternal AND tgenabled <> 'D' AND tgname = ANY(%s)
+"""
+
+def bump(table):
+    """Mark a watched table as changed in this process."""
+    with _lock:
+        _versions[table] += 1
+
+def mark_written(table):
+    """
+    Record that this process just wrote to `table`.
+
+    Only bumps while the table is polled: when it is pushed, the trigger's own
+    NOTIFY bumps it moments later, and bumping here too would rerun watchers twice.
+    """
+    with _lock:
+        if not _is_pushed(table):
+            _versions[table] += 1
+
+def _is_pushed(table):
+    # Caller holds _lock
+    return _state["connected"] and table in _state["triggered"]
+
+def _bump_all():
+    with _lock:
+        for table in _versions:
+            _versions[table] += 1
+
+def get_version(table):
+    """
+    Return a value that changes whenever `table` changes.
+
+    Cheap enough to call on every rerun: it only reads in-process state. While the
+    listener is disconnected, or the table has no NOTIFY trigger, the value also
+    changes every POLL_SECONDS, so callers keyed on it degrade to polling instead of
+    going stale.
+    """
+    with _lock:
+        version = _versions[table]
+        if _is_pushed(table):
+            return ("push", version)
+    return ("poll", version, int(time.time() // POLL_SECONDS))
+
+def get_listener_status(table=None):
+    """
+    Return whether the listener is connected, its last error and notifications received.
+
+    With `table`, "live" says whether that table's changes are pushed (connected and
+    its trigger installed) rather than polled.
+    """
+    with _lock:
+        status = dict(_state, triggered=set(_state["triggered"]))
+        if table is not None:
+            status["live"] = _is_pushed(table)
+    status["running"] = _listener is not None and _listener.is_alive()
+    return status
+
+def _set_state(**updates):
+    with _lock:
+        _state.update(updates)
+
+def _installed_triggers(connection):
+    """Return the watched tables whose NOTIFY trigger exists and is enabled."""
+    triggers = {f"{channel}_trigger": table for table, channel in CHANNELS.items()}
+    with connection.cursor() as cursor:
+        cursor.execute(TRIGGERS_SQL, (list(triggers),))
+        return {triggers[name] for (name,) in cursor.fetchall()}
+
+def _check_triggers(connection):
+    """Refresh which tables are pushed; a table whose trigger just appeared is bumped."""
+    triggered = _installed_triggers(connection)
+    missing = sorted(set(CHANNELS) - triggered)
+    error = None
+    if missing:
+        error = f"NOTIFY trigger not installed on {', '.join(missing)} (run python notifications.py --install)"
+    with _lock:
+        for table in triggered - _state["triggered"]:
+            _versions[table] += 1
+        _state.update(triggered=triggered, error=error)
+
+def _listen(connect_kwargs):
+    channels = {channel: table for table, channel in CHANNELS.items()}
+    while True:
+        connection = None
+        try:
+            connection = psycopg2.connect(**connect_kwargs)
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with connection.cursor() as cursor:
+                for channel in channels:
+                    cursor.execute(f"LISTEN {channel}")
+            # Changes made while disconnected were not notified
+            _bump_all()
+            _set_state(connected=True, since=time.time(), triggered=set())
+            _check_triggers(connection)
+            while True:
+                if select.select([connection], [], [], POLL_SECONDS) == ([], [], []):
+                    # Idle: keeps the connection alive and picks up a later --install
+                    _check_triggers(connection)
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    if notify.channel in channels:
+                        bump(channels[notify.channel])
+                        with _lock:
+                            _state["notifications"] += 1
+        except Exception as e:
+            _set_state(connected=False, error=str(e), triggered=set())
+            print(f"Change listener disconnected: {e}")
+        finally:
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        time.sleep(RECONNECT_SECONDS)
+
+def start_listener(connect_kwargs):
+    """Start the process-wide listener thread (once) on its own connection."""
+    global _listener
+    with _lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = threading.Thread(
+                target=_listen, args=(connect_kwargs,), name="change-listener", daemon=True
+            )
+            _listener.start()
+    return _listener
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--install", action="store_true", help="Create the NOTIFY triggers")
+    args = parser.parse_args()
+
+    if not args.install:
+        parser.print_help()
+        return
+
+    from sqlalchemy import text
+    from db import get_db_connection
+    with get_db_connection().begin() as connection:
+        for table in CHANNELS:
+            for statement in trigger_ddl(table):
+                connection.execute(text(statement))
+            print(f"{table}: NOTIFY {CHANNELS[table]} trigger installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils import init_auth_sidebar, init_cache_controls, init_date_range_selector
+from utils import init_auth_sidebar, init_cache_controls, init_date_range_selector, display_data_as_of
 from theme import apply_theme
 from data import load_tweet_analytics, get_thread_metrics
 from plots import create_time_series, create_bar_chart, apply_chart_theme
@@ -516,4 +516,5 @@ def main():
             display_tweet_card(row)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
+    display_data_as_of() 
\ No newline at end of file
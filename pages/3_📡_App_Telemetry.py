@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from utils import init_auth_sidebar, init_cache_controls, init_date_range_selector
+from utils import init_auth_sidebar, init_cache_controls, init_date_range_selector, display_data_as_of
 from theme import apply_theme
 from plots import apply_chart_theme, create_time_series
 from db import (
@@ -11,8 +11,9 @@ from db import (
     load_error_logs,
     get_top_entrypoints,
     get_hourly_stats,
-    get_daily_stats,
-    load_poll_results
+    time_buckets,
+    load_poll_results,
+    load_concurrently
 )
 
 # Set page config
@@ -56,11 +57,11 @@ def plot_hourly_distribution(df, title='Hourly Distribution'):
     
     return fig
 
-def plot_daily_metrics(df, title='Daily Trend'):
+def plot_trend(df, title='Trend'):
     fig = go.Figure()
     fig.add_trace(
         go.Scatter(
-            x=df['date'],
+            x=df['bucket'],
             y=df['count'],
             mode='lines+markers',
             line=dict(shape='spline', smoothing=0.3),
@@ -73,7 +74,7 @@ def plot_daily_metrics(df, title='Daily Trend'):
         fig,
         height=300,
         title=title,
-        xaxis_title="Date",
+        xaxis_title="Time",
         yaxis_title="Count"
     )
     
@@ -146,10 +147,23 @@ def main():
             include_custom=True
         )
     
-    # Load data for the selected time range
-    visits_df = load_visit_logs(start_date=start_date)
-    qna_df = load_qna_logs(start_date=start_date)
-    error_df = load_error_logs(start_date=start_date)
+    # Load data for the selected time range; the queries are independent, so run them in parallel
+    data = load_concurrently({
+        'visits': (load_visit_logs, dict(start_date=start_date, columns="telemetry_visits")),
+        'qna': (load_qna_logs, dict(start_date=start_date, columns="telemetry_qna")),
+        'errors': (load_error_logs, dict(start_date=start_date, columns="telemetry_errors")),
+        'visits_trend': (time_buckets, dict(table='visit_logs', start_date=start_date)),
+        'hourly_visits': (get_hourly_stats, dict(table_name='visit_logs', start_date=start_date)),
+        'entrypoints': (get_top_entrypoints, dict(limit=10, start_date=start_date)),
+        'qna_trend': (time_buckets, dict(table='qna_logs', start_date=start_date)),
+        'hourly_qna': (get_hourly_stats, dict(table_name='qna_logs', start_date=start_date)),
+        'errors_trend': (time_buckets, dict(table='error_logs', start_date=start_date)),
+        'hourly_errors': (get_hourly_stats, dict(table_name='error_logs', start_date=start_date)),
+        'poll_results': (load_poll_results, dict(start_date=start_date)),
+    })
+    visits_df = data['visits']
+    qna_df = data['qna']
+    error_df = data['errors']
     
     # High-level metrics
     col1, col2, col3 = st.columns(3)
@@ -184,24 +198,24 @@ def main():
     with tab1:
         col1, col2 = st.columns(2)
         with col1:
-            daily_visits = get_daily_stats('visit_logs', start_date=start_date)
-            st.plotly_chart(plot_daily_metrics(daily_visits, 'Daily Visits'), use_container_width=True)
+            visits_trend = data['visits_trend']
+            st.plotly_chart(plot_trend(visits_trend, f"Visits per {visits_trend.attrs['granularity'].title()}"), use_container_width=True)
         with col2:
-            hourly_visits = get_hourly_stats('visit_logs', start_date=start_date)
+            hourly_visits = data['hourly_visits']
             st.plotly_chart(plot_hourly_distribution(hourly_visits, 'Hourly Distribution'), use_container_width=True)
         
         # Top entrypoints
         st.markdown("### Top Entry Points")
-        entrypoint_counts = get_top_entrypoints(limit=10, start_date=start_date)
+        entrypoint_counts = data['entrypoints']
         st.bar_chart(entrypoint_counts.set_index('entrypoint')['count'])
     
     with tab2:
         col1, col2 = st.columns(2)
         with col1:
-            daily_qna = get_daily_stats('qna_logs', start_date=start_date)
-            st.plotly_chart(plot_daily_metrics(daily_qna, 'Daily Questions'), use_container_width=True)
+            qna_trend = data['qna_trend']
+            st.plotly_chart(plot_trend(qna_trend, f"Questions per {qna_trend.attrs['granularity'].title()}"), use_container_width=True)
         with col2:
-            hourly_qna = get_hourly_stats('qna_logs', start_date=start_date)
+            hourly_qna = data['hourly_qna']
             st.plotly_chart(plot_hourly_distribution(hourly_qna, 'Questions by Hour'), use_container_width=True)
         
         # Recent questions
@@ -215,10 +229,10 @@ def main():
     with tab3:
         col1, col2 = st.columns(2)
         with col1:
-            daily_errors = get_daily_stats('error_logs', start_date=start_date)
-            st.plotly_chart(plot_daily_metrics(daily_errors, 'Daily Errors'), use_container_width=True)
+            errors_trend = data['errors_trend']
+            st.plotly_chart(plot_trend(errors_trend, f"Errors per {errors_trend.attrs['granularity'].title()}"), use_container_width=True)
         with col2:
-            hourly_errors = get_hourly_stats('error_logs', start_date=start_date)
+            hourly_errors = data['hourly_errors']
             st.plotly_chart(plot_hourly_distribution(hourly_errors, 'Errors by Hour'), use_container_width=True)
         
         # Recent errors
@@ -232,7 +246,7 @@ def main():
     with tab4:
         st.subheader("🗳️ User Feedback: Poll Insights")
 
-        poll_results_df = load_poll_results(start_date=start_date)
+        poll_results_df = data['poll_results']
 
         if not poll_results_df.empty:
             # Clean feature names for all subsequent uses in this tab
@@ -289,4 +303,5 @@ def main():
             st.info("📊 No poll data available for the selected time range. Cast some votes to see results here!", icon="ℹ️")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
+    display_data_as_of() 
\ No newline at end of file
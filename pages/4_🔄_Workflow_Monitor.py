@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from utils import init_auth_sidebar, display_refresh_controls, init_cache_controls, init_date_range_selector
+from utils import init_auth_sidebar, display_refresh_controls, init_cache_controls, init_date_range_selector, display_data_as_of
 from theme import apply_theme
 from plots import create_bar_chart, apply_chart_theme
 from db import load_workflow_runs
@@ -206,7 +206,7 @@ def main():
         )
     
     # Load workflow data
-    df = load_workflow_runs(start_date=start_date)
+    df = load_workflow_runs(start_date=start_date, columns="workflow_monitor")
     
     # Calculate stats
     stats = get_workflow_stats(df)
@@ -236,4 +236,5 @@ def main():
     display_error_log(df)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
+    display_data_as_of() 
\ No newline at end of file
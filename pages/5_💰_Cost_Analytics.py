@@ -2,8 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from utils import init_auth_sidebar, init_cache_controls, format_cost, format_number, init_date_range_selector
+from utils import init_auth_sidebar, init_cache_controls, format_cost, format_number, init_date_range_selector, display_data_as_of
 from theme import apply_theme
+from caching import cached_loader
 from plots import (
     create_area_chart,
     create_bar_chart,
@@ -12,13 +13,15 @@ from plots import (
     apply_chart_theme,
 )
 from db import (
-    load_token_usage_logs,
+    load_token_usage_daily,
     get_model_stats,
     get_process_stats,
     get_daily_cost_stats,
     get_daily_cost_stats_grouped,
     get_available_models,
     get_available_processes,
+    table_probe,
+    ROLLUP_TABLE,
 )
 
 # Set page config
@@ -37,15 +40,15 @@ if not is_authenticated:
 init_cache_controls()
 
 
-@st.cache_data(ttl=3600)
+@cached_loader(ttl=3600, probe=table_probe("token_usage_logs", ROLLUP_TABLE))
 def load_all_cost_data(start_date=None, end_date=None):
     """Load all cost data once and return structured datasets for local filtering."""
-    # Load the raw token usage data for flexible local filtering
-    raw_data = load_token_usage_logs(start_date=start_date, end_date=end_date)
+    # Daily sums per model and process, streamed from the raw logs, support all local filtering
+    usage_data = load_token_usage_daily(start_date=start_date, end_date=end_date)
     
-    if raw_data.empty:
+    if usage_data.empty:
         return {
-            'raw_data': pd.DataFrame(),
+            'usage_data': pd.DataFrame(),
             'model_stats': pd.DataFrame(), 
             'process_stats': pd.DataFrame(),
             'daily_costs': pd.DataFrame(),
@@ -59,11 +62,11 @@ def load_all_cost_data(start_date=None, end_date=None):
     daily_costs = get_daily_cost_stats(start_date=start_date, end_date=end_date)
     
     # Get available options for filters
-    available_models = raw_data['model_name'].unique().tolist()
-    available_processes = raw_data['process_id'].dropna().unique().tolist()
+    available_models = usage_data['model_name'].dropna().unique().tolist()
+    available_processes = usage_data['process_id'].dropna().unique().tolist()
     
     return {
-        'raw_data': raw_data,
+        'usage_data': usage_data,
         'model_stats': model_stats,
         'process_stats': process_stats, 
         'daily_costs': daily_costs,
@@ -74,25 +77,25 @@ def load_all_cost_data(start_date=None, end_date=None):
 
 def apply_comprehensive_filters(data_dict, selected_models, selected_processes):
     """Apply filters to all datasets with proper cross-filtering."""
-    raw_data = data_dict['raw_data'].copy()
+    usage_data = data_dict['usage_data'].copy()
     
-    # Apply filters to raw data first
+    # Apply filters to the daily usage data first
     if selected_models:
-        raw_data = raw_data[raw_data['model_name'].isin(selected_models)]
+        usage_data = usage_data[usage_data['model_name'].isin(selected_models)]
     if selected_processes:
-        raw_data = raw_data[raw_data['process_id'].isin(selected_processes)]
+        usage_data = usage_data[usage_data['process_id'].isin(selected_processes)]
     
-    if raw_data.empty:
+    if usage_data.empty:
         return {
             'filtered_model_stats': pd.DataFrame(),
             'filtered_process_stats': pd.DataFrame(), 
             'filtered_daily_costs': pd.DataFrame(),
-            'filtered_raw_data': pd.DataFrame()
+            'filtered_usage_data': pd.DataFrame()
         }
     
-    # Recalculate aggregations from filtered raw data for consistency
+    # Recalculate aggregations from filtered usage data for consistency
     # Model stats
-    model_agg = raw_data.groupby('model_name').agg({
+    model_agg = usage_data.groupby('model_name', observed=True).agg({
         'prompt_tokens': 'sum',
         'completion_tokens': 'sum', 
         'cache_creation_input_tokens': 'sum',
@@ -101,7 +104,7 @@ def apply_comprehensive_filters(data_dict, selected_models, selected_processes):
         'completion_cost': 'sum',
         'cache_creation_cost': 'sum',
         'cache_read_cost': 'sum',
-        'id': 'count'  # total runs
+        'total_runs': 'sum'
     }).reset_index()
     
     # Rename and calculate total cost and tokens
@@ -117,7 +120,7 @@ def apply_comprehensive_filters(data_dict, selected_models, selected_processes):
                                 model_agg['total_cache_read_tokens'].fillna(0))
     
     # Process stats
-    process_agg = raw_data.groupby('process_id').agg({
+    process_agg = usage_data.groupby('process_id', observed=True).agg({
         'prompt_tokens': 'sum',
         'completion_tokens': 'sum',
         'cache_creation_input_tokens': 'sum', 
@@ -126,7 +129,7 @@ def apply_comprehensive_filters(data_dict, selected_models, selected_processes):
         'completion_cost': 'sum',
         'cache_creation_cost': 'sum',
         'cache_read_cost': 'sum',
-        'id': 'count'
+        'total_runs': 'sum'
     }).reset_index()
     
     process_agg.columns = ['process_id', 'total_prompt_tokens', 'total_completion_tokens',
@@ -141,8 +144,7 @@ def apply_comprehensive_filters(data_dict, selected_models, selected_processes):
                                   process_agg['total_cache_read_tokens'].fillna(0))
     
     # Daily costs and tokens
-    raw_data['date'] = pd.to_datetime(raw_data['tstp']).dt.date
-    daily_agg = raw_data.groupby('date').agg({
+    daily_agg = usage_data.groupby('date').agg({
         'prompt_tokens': 'sum',
         'completion_tokens': 'sum',
         'cache_creation_input_tokens': 'sum',
@@ -151,7 +153,7 @@ def apply_comprehensive_filters(data_dict, selected_models, selected_processes):
         'completion_cost': 'sum', 
         'cache_creation_cost': 'sum',
         'cache_read_cost': 'sum',
-        'id': 'count'
+        'total_runs': 'sum'
     }).reset_index()
     
     daily_agg.columns = ['date', 'prompt_tokens', 'completion_tokens', 
@@ -169,17 +171,17 @@ def apply_comprehensive_filters(data_dict, selected_models, selected_processes):
         'filtered_model_stats': model_agg,
         'filtered_process_stats': process_agg,
         'filtered_daily_costs': daily_agg,
-        'filtered_raw_data': raw_data
+        'filtered_usage_data': usage_data
     }
 
 
-def get_filtered_grouped_data(raw_data, group_by, selected_models=None, selected_processes=None, view_mode="cost"):
-    """Generate grouped time series data from filtered raw data."""
-    if raw_data.empty:
+def get_filtered_grouped_data(usage_data, group_by, selected_models=None, selected_processes=None, view_mode="cost"):
+    """Generate grouped time series data from filtered daily usage data."""
+    if usage_data.empty:
         return pd.DataFrame()
         
     # Apply filters
-    filtered_data = raw_data.copy()
+    filtered_data = usage_data.copy()
     if selected_models:
         filtered_data = filtered_data[filtered_data['model_name'].isin(selected_models)]
     if selected_processes:
@@ -188,51 +190,18 @@ def get_filtered_grouped_data(raw_data, group_by, selected_models=None, selected
     if filtered_data.empty:
         return pd.DataFrame()
     
-    # Add date column
-    filtered_data['date'] = pd.to_datetime(filtered_data['tstp']).dt.date
-    
     if group_by == "token_type":
-        if view_mode == "cost":
-            # Unpivot token costs by type
-            prompt_data = filtered_data.groupby('date')['prompt_cost'].sum().reset_index()
-            prompt_data['category'] = 'Prompt'
-            prompt_data['value'] = prompt_data['prompt_cost']
-            
-            completion_data = filtered_data.groupby('date')['completion_cost'].sum().reset_index()
-            completion_data['category'] = 'Completion'
-            completion_data['value'] = completion_data['completion_cost']
-            
-            cache_creation_data = filtered_data.groupby('date')['cache_creation_cost'].sum().reset_index()
-            cache_creation_data['category'] = 'Cache Creation'
-            cache_creation_data['value'] = cache_creation_data['cache_creation_cost'].fillna(0)
-            
-            cache_read_data = filtered_data.groupby('date')['cache_read_cost'].sum().reset_index()
-            cache_read_data['category'] = 'Cache Read'
-            cache_read_data['value'] = cache_read_data['cache_read_cost'].fillna(0)
-        else:  # tokens mode
-            # Unpivot token counts by type
-            prompt_data = filtered_data.groupby('date')['prompt_tokens'].sum().reset_index()
-            prompt_data['category'] = 'Prompt'
-            prompt_data['value'] = prompt_data['prompt_tokens']
-            
-            completion_data = filtered_data.groupby('date')['completion_tokens'].sum().reset_index()
-            completion_data['category'] = 'Completion'
-            completion_data['value'] = completion_data['completion_tokens']
-            
-            cache_creation_data = filtered_data.groupby('date')['cache_creation_input_tokens'].sum().reset_index()
-            cache_creation_data['category'] = 'Cache Creation'
-            cache_creation_data['value'] = cache_creation_data['cache_creation_input_tokens'].fillna(0)
-            
-            cache_read_data = filtered_data.groupby('date')['cache_read_input_tokens'].sum().reset_index()
-            cache_read_data['category'] = 'Cache Read'
-            cache_read_data['value'] = cache_read_data['cache_read_input_tokens'].fillna(0)
-        
-        result = pd.concat([
-            prompt_data[['date', 'category', 'value']],
-            completion_data[['date', 'category', 'value']],
-            cache_creation_data[['date', 'category', 'value']], 
-            cache_read_data[['date', 'category', 'value']]
-        ], ignore_index=True)
+        # Sum all four token type columns per day in one pass, then unpivot
+        value_columns = {
+            'prompt_cost' if view_mode == "cost" else 'prompt_tokens': 'Prompt',
+            'completion_cost' if view_mode == "cost" else 'completion_tokens': 'Completion',
+            'cache_creation_cost' if view_mode == "cost" else 'cache_creation_input_tokens': 'Cache Creation',
+            'cache_read_cost' if view_mode == "cost" else 'cache_read_input_tokens': 'Cache Read',
+        }
+        daily_data = filtered_data.groupby('date')[list(value_columns)].sum().reset_index()
+        result = daily_data.melt(id_vars='date', var_name='category', value_name='value')
+        result['category'] = result['category'].map(value_columns)
+        result['value'] = result['value'].fillna(0)
         
         # Rename value column to maintain compatibility with existing plotting functions
         result = result.rename(columns={'value': 'cost' if view_mode == "cost" else 'tokens'})
@@ -240,7 +209,7 @@ def get_filtered_grouped_data(raw_data, group_by, selected_models=None, selected
     elif group_by == "model":
         if view_mode == "cost":
             # Group by model for costs
-            result = filtered_data.groupby(['date', 'model_name']).agg({
+            result = filtered_data.groupby(['date', 'model_name'], observed=True).agg({
                 'prompt_cost': 'sum',
                 'completion_cost': 'sum',
                 'cache_creation_cost': 'sum', 
@@ -251,7 +220,7 @@ def get_filtered_grouped_data(raw_data, group_by, selected_models=None, selected
                              result['cache_creation_cost'].fillna(0) + result['cache_read_cost'].fillna(0))
         else:  # tokens mode
             # Group by model for tokens
-            result = filtered_data.groupby(['date', 'model_name']).agg({
+            result = filtered_data.groupby(['date', 'model_name'], observed=True).agg({
                 'prompt_tokens': 'sum',
                 'completion_tokens': 'sum',
                 'cache_creation_input_tokens': 'sum', 
@@ -404,7 +373,7 @@ def main():
     # Load all data once (cached)
     data_dict = load_all_cost_data(start_date=start_date, end_date=end_date)
     
-    if data_dict['raw_data'].empty:
+    if data_dict['usage_data'].empty:
         st.warning("No data available for the selected time period.")
         return
 
@@ -528,7 +497,7 @@ def main():
     }
     
     grouped_data = get_filtered_grouped_data(
-        data_dict['raw_data'], 
+        data_dict['usage_data'], 
         group_by_map[group_by],
         selected_models, 
         selected_processes,
@@ -672,3 +641,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    display_data_as_of()
@@ -2,15 +2,18 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
-from utils import init_auth_sidebar, init_cache_controls, init_date_range_selector
+from utils import init_auth_sidebar, init_cache_controls, init_date_range_selector, display_data_as_of
 from theme import apply_theme
+from caching import cached_loader
 from plots import create_time_series, create_bar_chart, apply_chart_theme
-from db import (
+from db_async import (
     load_tweet_analysis,
     get_tweet_stats,
     get_daily_tweet_stats,
-    get_top_authors
+    get_top_authors,
+    gather_page_data
 )
+from db import table_probe, AUTHOR_SKETCH_TABLE
 
 # Set page config
 st.set_page_config(layout="wide", page_title="Social Media Discussions")
@@ -27,15 +30,15 @@ if not is_authenticated:
 # Cache refresh controls
 init_cache_controls()
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
+@cached_loader(ttl=3600, probe=table_probe("llm_tweets", "tweet_analysis", AUTHOR_SKETCH_TABLE))
 def load_cached_data(start_date=None):
     """Load and cache all required data."""
-    return {
-        'stats': get_tweet_stats(start_date=start_date),
-        'daily_stats': get_daily_tweet_stats(start_date=start_date),
-        'top_authors': get_top_authors(limit=10, start_date=start_date),
-        'analysis': load_tweet_analysis(start_date=start_date)
-    }
+    return gather_page_data({
+        'stats': (get_tweet_stats, dict(start_date=start_date, approximate=True)),
+        'daily_stats': (get_daily_tweet_stats, dict(start_date=start_date, approximate=True)),
+        'top_authors': (get_top_authors, dict(limit=10, start_date=start_date)),
+        'analysis': (load_tweet_analysis, dict(start_date=start_date, columns="discussions_analysis"))
+    })
 
 def format_number(num: float) -> str:
     """Format large numbers with K/M suffix."""
@@ -272,4 +275,5 @@ def main():
             st.info("No analysis history available for the selected time period.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
+    display_data_as_of() 
\ No newline at end of file
@@ -4,7 +4,7 @@ import os
 import sys
 from datetime import datetime
 import json
-from utils import init_auth_sidebar, display_refresh_controls, init_cache_controls
+from utils import init_auth_sidebar, init_cache_controls, display_data_as_of
 from theme import apply_theme
 import llm
 
@@ -12,7 +12,24 @@ import llm
 PROJECT_PATH = os.environ.get("PROJECT_PATH", os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(PROJECT_PATH)
 
-from db import get_pending_tweet_replies, update_tweet_reply_status, update_tweet_reply_text_and_status, delete_tweet_reply
+from db import (
+    get_pending_tweet_replies,
+    pending_replies_cursor,
+    count_pending_tweet_replies,
+    get_tweet_reply_by_id,
+    update_tweet_reply_status,
+    update_tweet_reply_text_and_status,
+    delete_tweet_reply,
+    review_tweet_replies,
+    get_table_version
+)
+from notifications import get_listener_status, POLL_SECONDS
+
+# Pending posts shown per page
+PAGE_SIZE = 10
+
+# How often each session checks the in-process tweet_replies version (no DB query)
+WATCH_SECONDS = 3
 
 st.set_page_config(
     page_title="Pending Posts",
@@ -34,11 +51,25 @@ init_cache_controls()
 
 st.title("📨 Pending Posts")
 
-# Add refresh controls
-display_refresh_controls(refresh_interval_seconds=60) # Refresh every 60 seconds
+# Version of tweet_replies this run renders; the watcher below reruns the page when it moves
+replies_version = get_table_version("tweet_replies")
+
+@st.fragment(run_every=WATCH_SECONDS)
+def watch_for_changes():
+    # Only reads process memory, so checking every few seconds is free; the page
+    # refetches only after a reply is inserted, updated or deleted
+    if get_table_version("tweet_replies") != replies_version:
+        st.rerun()
+    listener_status = get_listener_status("tweet_replies")
+    if listener_status["live"]:
+        st.caption("🟢 Live: new and changed posts appear within seconds")
+    else:
+        st.caption(f"🟡 Live updates unavailable, refreshing every {POLL_SECONDS}s ({listener_status['error'] or 'connecting'})")
 
-# Get post_id from URL parameter
-post_id = st.query_params.get("post_id", [None])[0]
+watch_for_changes()
+
+# Get post_id from URL parameter (st.query_params returns a single string per key)
+post_id = st.query_params.get("post_id")
 
 @st.dialog("Confirm Deletion")
 def confirm_delete_dialog(post_id, post_text):
@@ -66,8 +97,45 @@ def confirm_delete_dialog(post_id, post_text):
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+@st.dialog("Confirm Bulk Deletion")
+def confirm_bulk_delete_dialog(post_ids):
+    st.markdown('<div class="dialog-content">', unsafe_allow_html=True)
+    st.warning("⚠️ This action cannot be undone")
+    st.write(f"Are you sure you want to delete {len(post_ids)} posts?")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        if st.button("Yes, Delete All", type="primary", key="confirm_bulk_delete_btn"):
+            apply_bulk_review(deleted=post_ids)
+    
+    with col2:
+        if st.button("Cancel", key="cancel_bulk_delete_btn"):
+            st.rerun()
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def apply_bulk_review(approved=(), rejected=(), deleted=()):
+    # Approvals keep any unsaved edits from the cards' edit boxes
+    edited = {}
+    for post_id in approved:
+        edited_text = st.session_state.get(f"edit_{post_id}")
+        if edited_text is not None and edited_text != st.session_state.bulk_responses.get(post_id):
+            edited[post_id] = edited_text
+    counts = review_tweet_replies(approved=approved, rejected=rejected, deleted=deleted, edited=edited)
+    if counts is None:
+        st.error("Failed to apply bulk action; no posts were changed.")
+        return
+    for post_id in list(approved) + list(rejected) + list(deleted):
+        st.session_state.pop(f"select_{post_id}", None)
+    st.session_state.bulk_result = ", ".join(f"{count} {action}" for action, count in counts.items() if count)
+    st.rerun()
+
 # Function to display post details in card format
-def display_post_card(post_row):
+def display_post_card(post_row, selectable=False):
+    if selectable:
+        st.checkbox(f"Select post #{post_row['id']}", key=f"select_{post_row['id']}")
+    
     # Parse metadata
     meta_data = post_row["meta_data"]
     if isinstance(meta_data, str):
@@ -201,35 +269,75 @@ def display_post_card(post_row):
 
 # Main app logic
 if post_id:
-    # Get specific post
-    pending_posts = get_pending_tweet_replies(limit=100)
-    
-    if not pending_posts.empty:
-        # Find the post with the specified ID
-        try:
-            post_id = int(post_id)
-            post = pending_posts[pending_posts["id"] == post_id]
-            
-            if not post.empty:
-                display_post_card(post.iloc[0])
-            else:
-                st.warning(f"No pending post found with ID: {post_id}")
-        except ValueError:
-            st.error("Invalid post ID")
+    # Load just the linked post
+    try:
+        post = get_tweet_reply_by_id(int(post_id), version=replies_version)
+    except ValueError:
+        st.error("Invalid post ID")
     else:
-        st.info("No pending posts found.")
+        if post.empty or post.iloc[0]["approval_status"] != "pending":
+            st.warning(f"No pending post found with ID: {post_id}")
+        else:
+            display_post_card(post.iloc[0])
 else:
-    # Show all pending posts
-    pending_posts = get_pending_tweet_replies(limit=10)
+    # Show pending posts a page at a time; each page starts after the last row of the
+    # previous one, so deep pages cost the same as the first
+    if "pending_page_cursors" not in st.session_state:
+        st.session_state.pending_page_cursors = [None]
+    cursors = st.session_state.pending_page_cursors
+    pending_count = count_pending_tweet_replies(version=replies_version)
+    pending_posts = get_pending_tweet_replies(limit=PAGE_SIZE, before=cursors[-1], version=replies_version)
+    
+    if pending_posts.empty and len(cursors) > 1:
+        # The page emptied (e.g. its posts were all approved); step back
+        cursors.pop()
+        st.rerun()
     
     if not pending_posts.empty:
-        st.write(f"Found {len(pending_posts)} pending posts")
+        page_count = max(1, -(-pending_count // PAGE_SIZE))
+        st.write(f"Found {pending_count} pending posts · page {len(cursors)} of {page_count}")
+        
+        # Multi-select mode: tick posts, then approve/reject/delete them in one transaction
+        bulk_mode = st.toggle("Select multiple", key="bulk_mode")
+        if "bulk_result" in st.session_state:
+            st.success(f"Bulk action applied: {st.session_state.pop('bulk_result') or 'no changes'}")
+        if bulk_mode:
+            st.session_state.bulk_responses = dict(zip(pending_posts["id"], pending_posts["response"]))
+            selected_ids = [int(post_id) for post_id in pending_posts["id"] if st.session_state.get(f"select_{post_id}")]
+            bulk_col1, bulk_col2, bulk_col3, bulk_col4 = st.columns([1, 1, 1, 2])
+            with bulk_col1:
+                if st.button(f"✅ Approve ({len(selected_ids)})", type="primary", disabled=not selected_ids, key="bulk_approve"):
+                    apply_bulk_review(approved=selected_ids)
+            with bulk_col2:
+                if st.button(f"❌ Reject ({len(selected_ids)})", type="secondary", disabled=not selected_ids, key="bulk_reject"):
+                    apply_bulk_review(rejected=selected_ids)
+            with bulk_col3:
+                if st.button(f"🗑️ Delete ({len(selected_ids)})", type="secondary", disabled=not selected_ids, key="bulk_delete"):
+                    confirm_bulk_delete_dialog(selected_ids)
+            with bulk_col4:
+                if st.button("Select page", key="bulk_select_page"):
+                    for post_id in pending_posts["id"]:
+                        st.session_state[f"select_{post_id}"] = True
+                    st.rerun()
         
         # Create a container for all cards to ensure consistent styling
         for _, post in pending_posts.iterrows():
-            display_post_card(post)
+            display_post_card(post, selectable=bulk_mode)
+        
+        prev_col, _, next_col = st.columns([1, 4, 1])
+        with prev_col:
+            if st.button("← Newer", disabled=len(cursors) == 1, use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with next_col:
+            has_next = len(cursors) * PAGE_SIZE < pending_count
+            if st.button("Older →", disabled=not has_next, use_container_width=True):
+                cursors.append(pending_replies_cursor(pending_posts))
+                st.rerun()
     else:
         st.info("No pending posts found.")
 
+display_data_as_of()
+
 # Add footer
 st.markdown("<div class='footer'>LLMPedia Post Approval System</div>", unsafe_allow_html=True) 
\ No newline at end of file
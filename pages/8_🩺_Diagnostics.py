@@ -0,0 +1,97 @@
+import streamlit as st
+import pandas as pd
+from utils import init_auth_sidebar, init_cache_controls
+from theme import apply_theme
+from caching import get_cache_stats
+from db import get_pool_stats
+from dtypes import get_memory_report
+from instrumentation import get_records, get_loader_summary, clear_records, SQLITE_PATH
+
+# Set page config
+st.set_page_config(layout="wide", page_title="Diagnostics")
+
+# Apply theme
+apply_theme()
+
+# Initialize authentication sidebar
+is_authenticated = init_auth_sidebar()
+if not is_authenticated:
+    st.error("⚠️ Please login using the sidebar to access diagnostics")
+    st.stop()
+
+# Cache refresh controls
+init_cache_controls()
+
+def main():
+    st.title("🩺 Diagnostics")
+    st.caption(
+        "Loader calls recorded by this server process since it started"
+        + (f" (also persisted to `{SQLITE_PATH}`)" if SQLITE_PATH else "")
+        + ". Cache hits record no DB time."
+    )
+
+    records = get_records()
+    if records.empty:
+        st.info("No loader calls recorded yet. Open another page to generate some.", icon="ℹ️")
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Calls", f"{len(records):,}")
+        col2.metric("p50 Wall Time", f"{records['wall_ms'].quantile(0.5):,.0f} ms")
+        col3.metric("p95 Wall Time", f"{records['wall_ms'].quantile(0.95):,.0f} ms")
+        col4.metric("Errors", f"{records['error'].count():,}")
+
+        st.markdown("### Loaders")
+        st.dataframe(
+            get_loader_summary().style.format({
+                "hit_rate": lambda rate: "" if pd.isna(rate) else f"{rate:.0%}",
+                "p50_ms": "{:,.1f}",
+                "p95_ms": "{:,.1f}",
+                "p50_db_ms": "{:,.1f}",
+                "p95_db_ms": "{:,.1f}",
+                "max_rows": "{:,.0f}",
+                "max_mb": "{:,.2f}",
+            }),
+            use_container_width=True
+        )
+
+        st.markdown("### Slowest Recent Calls")
+        slowest = records.nlargest(20, "wall_ms")
+        st.dataframe(
+            slowest[["tstp", "loader", "cache", "wall_ms", "db_ms", "queries", "rows", "bytes", "error"]],
+            use_container_width=True,
+            hide_index=True
+        )
+        for _, call in slowest[slowest["sql"].notna()].head(10).iterrows():
+            with st.expander(f"{call['loader']} · {call['wall_ms']:,.0f} ms · {call['tstp']:%H:%M:%S}"):
+                st.code(call["sql"], language="sql")
+
+        if st.button("🗑️ Clear Recorded Calls", type="secondary"):
+            clear_records()
+            st.rerun()
+
+    st.markdown("### Frame Memory")
+    memory_report = get_memory_report()
+    if memory_report.empty:
+        st.caption("No compacted frames loaded yet.")
+    else:
+        st.dataframe(
+            memory_report.style.format({"rows": "{:,.0f}", "before_mb": "{:,.2f}", "after_mb": "{:,.2f}", "saved": "{:.0%}"}),
+            use_container_width=True
+        )
+
+    st.markdown("### Connection Pool")
+    pool_stats = get_pool_stats()
+    st.code(pool_stats.pop("status"))
+    st.dataframe(pd.DataFrame([pool_stats]), use_container_width=True, hide_index=True)
+
+    st.markdown("### Cache")
+    cache_stats = get_cache_stats()
+    if cache_stats:
+        stats_df = pd.DataFrame.from_dict(cache_stats, orient="index")
+        stats_df = stats_df[["calls", "hits", "misses", "hit_rate"]].sort_values("calls", ascending=False)
+        st.dataframe(stats_df.style.format({"hit_rate": "{:.0%}"}), use_container_width=True)
+    else:
+        st.caption("No cached loaders called yet.")
+
+if __name__ == "__main__":
+    main()
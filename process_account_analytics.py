@@ -2,6 +2,13 @@ import pandas as pd
 import re
 from pathlib import Path
 from datetime import datetime
+from text_cleaning import normalize_text_column
+
+# Thread starts carry the paper date, e.g. (Dec 19, 2024); matched case-sensitively
+THREAD_START_PATTERN = re.compile(r"\([A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}\)")
+ARXIV_LINK_PATTERN = re.compile(r"arxiv link:", re.IGNORECASE)
+LLMPEDIA_LINK_PATTERN = re.compile(r"llmpedia link:", re.IGNORECASE)
+DISCUSSION_PATTERN = re.compile(r"related discussion:|repo:", re.IGNORECASE)
 
 
 def get_analytics_files():
@@ -20,6 +27,20 @@ def get_analytics_files():
     return [f for _, f in sorted(files, reverse=True)]
 
 
+def tag_tweet_roles(df):
+    """
+    Set the is_thread_start / is_link_tweet / is_discussion_tweet columns from the post texts.
+
+    Texts are matched after normalize_text_column, so thread starts whose date is
+    styled with mathematical letters are still recognized.
+    """
+    text = normalize_text_column(df["Post text"])
+    df["is_thread_start"] = text.str.contains(THREAD_START_PATTERN)
+    df["is_link_tweet"] = text.str.contains(ARXIV_LINK_PATTERN) & text.str.contains(LLMPEDIA_LINK_PATTERN)
+    df["is_discussion_tweet"] = text.str.contains(DISCUSSION_PATTERN)
+    return df
+
+
 def identify_threads():
     """Identify threads in the tweet data across multiple files."""
     analytics_files = get_analytics_files()
@@ -45,25 +66,9 @@ def identify_threads():
         print(f"Total number of tweets: {len(df)}")
         print(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
 
-        # Initialize thread role columns
-        df["is_thread_start"] = False
-        df["is_link_tweet"] = False
-        df["is_discussion_tweet"] = False
-        df["thread_id"] = None
-
-        # Pattern to match dates like (Dec 19, 2024) or similar
-        date_pattern = r"\([A-Z][a-z]{2}\s+\d{1,2},\s+\d{4}\)"
-
         # Mark all tweets with their roles
-        for i, row in df.iterrows():
-            text = str(row["Post text"]) if pd.notna(row["Post text"]) else ""
-
-            if re.search(date_pattern, text):
-                df.loc[i, "is_thread_start"] = True
-            if "arxiv link:" in text.lower() and "llmpedia link:" in text.lower():
-                df.loc[i, "is_link_tweet"] = True
-            if "related discussion:" in text.lower() or "repo:" in text.lower():
-                df.loc[i, "is_discussion_tweet"] = True
+        tag_tweet_roles(df)
+        df["thread_id"] = None
 
         # Group tweets into threads
         i = 0
@@ -0,0 +1,199 @@
+"""Maintain the daily token usage rollup and the llm_tweets author sketches read by the loaders.
+
+Usage:
+    python rollups.py            # recompute only days touched since the last run
+    python rollups.py --full     # rebuild everything
+
+Schedule the incremental form (e.g. hourly via cron or a systemd timer); loaders read
+raw rows for any days the rollup does not cover yet, so a missed run only costs speed.
+"""
+import argparse
+from datetime import datetime, time as dt_time, timedelta
+from sqlalchemy import text
+from hll import HyperLogLog
+from db import (
+    get_db_connection,
+    ROLLUP_TABLE,
+    ROLLUP_STATE_TABLE,
+    AUTHOR_SKETCH_TABLE,
+    DAILY_USAGE_COLUMNS,
+    DAILY_USAGE_SELECT,
+    DAILY_USAGE_GROUP_BY,
+)
+
+# Created from the rollup query itself so column types always match the raw-row path
+ROLLUP_DDL = [
+    f"CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} AS {DAILY_USAGE_SELECT} {DAILY_USAGE_GROUP_BY} WITH NO DATA",
+    f"CREATE INDEX IF NOT EXISTS {ROLLUP_TABLE}_date_idx ON {ROLLUP_TABLE} (date)",
+    f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_STATE_TABLE} (
+        rollup_name TEXT PRIMARY KEY,
+        watermark TIMESTAMP,
+        complete_through DATE,
+        refreshed_at TIMESTAMP NOT NULL
+    )
+    """,
+]
+
+ROLLUP_INSERT = f"INSERT INTO {ROLLUP_TABLE} ({', '.join(DAILY_USAGE_COLUMNS)})"
+
+AUTHOR_SKETCH_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {AUTHOR_SKETCH_TABLE} (
+        date DATE PRIMARY KEY,
+        sketch BYTEA NOT NULL,
+        authors INTEGER NOT NULL
+    )
+"""
+
+# Rows can commit after later-stamped rows (long transactions, retries), so each run
+# re-aggregates every day touched within this margin before the previous watermark, and
+# days inside the margin stay unfinalized for the loaders
+INCREMENTAL_OVERLAP = timedelta(days=1)
+
+# Tweets are scraped after they are posted, so recent days are re-sketched on every run
+AUTHOR_SKETCH_LOOKBACK = timedelta(days=7)
+
+
+def _save_watermark(connection, name, watermark, overlap=timedelta(0)):
+    """
+    Record how far a rollup has been refreshed.
+
+    Days before the day of (watermark - overlap) are final; loaders read raw rows from
+    that day on, so rows a later run may still pick up are never hidden behind the rollup.
+    """
+    connection.execute(
+        text(f"""
+            INSERT INTO {ROLLUP_STATE_TABLE} (rollup_name, watermark, complete_through, refreshed_at)
+            VALUES (:name, :watermark, :complete_through, :now)
+            ON CONFLICT (rollup_name) DO UPDATE
+            SET watermark = EXCLUDED.watermark,
+                complete_through = EXCLUDED.complete_through,
+                refreshed_at = EXCLUDED.refreshed_at
+        """),
+        {
+            "name": name,
+            "watermark": watermark,
+            "complete_through": (watermark - overlap).date(),
+            "now": datetime.now(),
+        },
+    )
+
+
+def refresh_token_usage_rollup(full=False):
+    """
+    Recompute rollup rows for every day that received token usage since the last run,
+    including rows stamped up to INCREMENTAL_OVERLAP before its watermark.
+
+    Returns:
+        list: Days that were recomputed
+    """
+    engine = get_db_connection()
+    with engine.begin() as connection:
+        # Full rebuilds scan all of token_usage_logs, well past the dashboard's statement timeout
+        connection.execute(text("SET LOCAL statement_timeout = 0"))
+        for statement in ROLLUP_DDL:
+            connection.execute(text(statement))
+
+        previous = connection.execute(
+            text(f"SELECT watermark FROM {ROLLUP_STATE_TABLE} WHERE rollup_name = :name FOR UPDATE"),
+            {"name": ROLLUP_TABLE},
+        ).scalar()
+        watermark = connection.execute(text("SELECT MAX(tstp) FROM token_usage_logs")).scalar()
+        if watermark is None:
+            return []
+
+        if full or previous is None:
+            connection.execute(text(f"DELETE FROM {ROLLUP_TABLE}"))
+            connection.execute(text(ROLLUP_INSERT + DAILY_USAGE_SELECT + DAILY_USAGE_GROUP_BY))
+            days = connection.execute(text(f"SELECT DISTINCT date FROM {ROLLUP_TABLE} ORDER BY date")).scalars().all()
+        else:
+            days = connection.execute(
+                text("SELECT DISTINCT DATE(tstp) FROM token_usage_logs WHERE tstp > :since ORDER BY 1"),
+                {"since": previous - INCREMENTAL_OVERLAP},
+            ).scalars().all()
+            if days:
+                connection.execute(text(f"DELETE FROM {ROLLUP_TABLE} WHERE date = ANY(:days)"), {"days": list(days)})
+                connection.execute(
+                    text(
+                        ROLLUP_INSERT
+                        + DAILY_USAGE_SELECT
+                        + " WHERE tstp >= :first_day AND DATE(tstp) = ANY(:days) "
+                        + DAILY_USAGE_GROUP_BY
+                    ),
+                    {"first_day": days[0], "days": list(days)},
+                )
+
+        # Only moved after the recompute, in the same transaction
+        _save_watermark(connection, ROLLUP_TABLE, watermark, INCREMENTAL_OVERLAP)
+    return days
+
+
+def refresh_author_sketches(full=False):
+    """
+    Rebuild the daily author sketches for every day within AUTHOR_SKETCH_LOOKBACK of
+    the last run (or all days with full=True).
+
+    Returns:
+        list: Days that were re-sketched
+    """
+    engine = get_db_connection()
+    with engine.begin() as connection:
+        # The GROUP BY must finish sorting llm_tweets before the first row streams
+        connection.execute(text("SET LOCAL statement_timeout = 0"))
+        for statement in (ROLLUP_DDL[-1], AUTHOR_SKETCH_DDL):
+            connection.execute(text(statement))
+
+        previous = connection.execute(
+            text(f"SELECT watermark FROM {ROLLUP_STATE_TABLE} WHERE rollup_name = :name FOR UPDATE"),
+            {"name": AUTHOR_SKETCH_TABLE},
+        ).scalar()
+        watermark = connection.execute(text("SELECT MAX(tweet_timestamp) FROM llm_tweets")).scalar()
+        if watermark is None:
+            return []
+
+        since = None if full or previous is None else datetime.combine(previous.date() - AUTHOR_SKETCH_LOOKBACK, dt_time.min)
+        where = " WHERE tweet_timestamp >= :since" if since else ""
+        sketches = {}
+        rows = connection.execute(
+            text(f"SELECT DATE(tweet_timestamp), author FROM llm_tweets{where} GROUP BY 1, 2")
+            .execution_options(stream_results=True),
+            {"since": since},
+        )
+        for day, author in rows:
+            if day not in sketches:
+                sketches[day] = [HyperLogLog(), 0]
+            sketches[day][0].add(author)
+            sketches[day][1] += 1
+
+        if since:
+            connection.execute(text(f"DELETE FROM {AUTHOR_SKETCH_TABLE} WHERE date >= :since_day"), {"since_day": since.date()})
+        else:
+            connection.execute(text(f"DELETE FROM {AUTHOR_SKETCH_TABLE}"))
+        if sketches:
+            connection.execute(
+                text(f"INSERT INTO {AUTHOR_SKETCH_TABLE} (date, sketch, authors) VALUES (:date, :sketch, :authors)"),
+                [
+                    {"date": day, "sketch": sketch.to_bytes(), "authors": authors}
+                    for day, (sketch, authors) in sketches.items()
+                ],
+            )
+        # Days inside the lookback can still gain late-scraped tweets, so they are not final yet
+        _save_watermark(connection, AUTHOR_SKETCH_TABLE, watermark, AUTHOR_SKETCH_LOOKBACK)
+    return sorted(sketches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch")
+    args = parser.parse_args()
+
+    for name, refresh in ((ROLLUP_TABLE, refresh_token_usage_rollup), (AUTHOR_SKETCH_TABLE, refresh_author_sketches)):
+        days = refresh(full=args.full)
+        if days:
+            print(f"{name}: recomputed {len(days)} day(s): {days[0]} to {days[-1]}")
+        else:
+            print(f"{name}: already up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Check the indexes behind the dashboard's loader queries and show how those queries run.
+
+Usage:
+    python schema_advisor.py                  # report missing indexes and their DDL
+    python schema_advisor.py --explain        # also EXPLAIN (ANALYZE, BUFFERS) each loader query
+    python schema_advisor.py --apply          # create the missing indexes
+
+Time filters on append-only tables get a BRIN index when rows are stored roughly in
+time order (pg_stats correlation), otherwise a btree. Indexes are created with
+CREATE INDEX CONCURRENTLY, so --apply does not block writers, but each build still
+scans its table once.
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from db import (
+    get_db_connection,
+    build_query,
+    LOG_TABLES,
+    APPEND_ONLY_TABLES,
+    _top_entrypoints_query,
+    _hourly_stats_query,
+    _daily_stats_query,
+    _tweet_analysis_query,
+    _tweet_stats_query,
+    _daily_tweet_stats_query,
+    _top_authors_query,
+    _pending_tweet_replies_query,
+    _poll_results_query,
+    _usage_stats_query,
+    _daily_cost_grouped_query,
+)
+
+# Time column each table's loaders filter on
+TIME_COLUMNS = {
+    **{table: "tstp" for table in LOG_TABLES},
+    "feature_poll_votes": "tstp",
+    "tweet_analysis": "tstp",
+    "llm_tweets": "tweet_timestamp",
+}
+
+# Tables whose DATE(time column) is filtered on directly (rollups.py recomputes days by date)
+DATE_FILTERED_TABLES = ["token_usage_logs"]
+
+# Minimum |correlation| between physical row order and the time column for BRIN to pay off
+BRIN_MIN_CORRELATION = 0.9
+
+PENDING_PREDICATE = "approval_status = 'pending'"
+
+EXISTING_INDEXES_SQL = """
+    SELECT
+        c.relname AS index_name,
+        am.amname AS method,
+        pg_get_indexdef(i.indexrelid, 1, true) AS first_key,
+        pg_get_expr(i.indpred, i.indrelid, true) AS predicate
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_am am ON am.oid = c.relam
+    WHERE i.indrelid = CAST(:table AS regclass)
+      AND i.indisvalid
+"""
+
+# Indexes left INVALID by an interrupted CREATE INDEX CONCURRENTLY; they cost writes
+# but are never used, and IF NOT EXISTS would skip rebuilding them
+INVALID_INDEXES_SQL = """
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = ANY(:names)
+      AND c.relnamespace = CAST(current_schema() AS regnamespace)
+      AND NOT i.indisvalid
+"""
+
+
+def _column_type(connection, table, column):
+    return connection.execute(
+        text("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :table AND column_name = :column
+        """),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def _correlation(connection, table, column):
+    return connection.execute(
+        text("""
+            SELECT correlation FROM pg_stats
+            WHERE schemaname = current_schema() AND tablename = :table AND attname = :column
+        """),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def _is_covered(existing, key, predicate):
+    """An index covers a recommendation if it leads with the same key (and predicate, for partial ones)."""
+    for index in existing:
+        if index["first_key"] != key:
+            continue
+        if predicate is None and index["predicate"] is None:
+            return True
+        if predicate is not None and index["predicate"] and "pending" in index["predicate"]:
+            return True
+    return False
+
+
+def recommend_indexes(connection):
+    """
+    Compare the live schema with the indexes the loaders need.
+
+    Returns:
+        list: One dict per recommendation with table, name, reason, ddl, and whether an
+        equivalent index already exists (`present`)
+    """
+    recommendations = []
+    skipped = []
+
+    def add(table, name, key, reason, ddl, existing, predicate=None):
+        recommendations.append({
+            "table": table,
+            "name": name,
+            "reason": reason,
+            "ddl": ddl,
+            "present": _is_covered(existing, key, predicate),
+        })
+
+    for table, column in TIME_COLUMNS.items():
+        column_type = _column_type(connection, table, column)
+        if column_type is None:
+            skipped.append(f"{table}.{column}: not found")
+            continue
+        existing = [dict(row._mapping) for row in connection.execute(text(EXISTING_INDEXES_SQL), {"table": table})]
+
+        correlation = _correlation(connection, table, column)
+        if correlation is None or abs(correlation) >= BRIN_MIN_CORRELATION:
+            name = f"{table}_{column}_brin"
+            reason = f"time range filters; rows stored in {column} order (correlation {correlation if correlation is not None else 'unknown'})"
+            ddl = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING brin ({column})"
+        else:
+            name = f"{table}_{column}_idx"
+            reason = f"time range filters; rows not stored in {column} order (correlation {correlation:.2f}), so BRIN would not prune"
+            ddl = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column})"
+        add(table, name, column, reason, ddl, existing)
+
+        if table in DATE_FILTERED_TABLES:
+            if column_type == "timestamp with time zone":
+                # DATE() of a timestamptz depends on the session TimeZone, so it cannot be indexed
+                skipped.append(f"{table}: DATE({column}) index needs timestamp without time zone")
+            else:
+                name = f"{table}_{column}_date_idx"
+                add(
+                    table, name, f"date({column})",
+                    f"DATE({column}) filters in rollups.py and daily grouping",
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} (DATE({column}))",
+                    existing,
+                )
+
+    if _column_type(connection, "tweet_replies", "approval_status") is None:
+        skipped.append("tweet_replies.approval_status: not found")
+    else:
+        existing = [dict(row._mapping) for row in connection.execute(text(EXISTING_INDEXES_SQL), {"table": "tweet_replies"})]
+        name = "tweet_replies_pending_tstp_idx"
+        add(
+            "tweet_replies", name, "tstp",
+            "pending replies queue and its (tstp, id) keyset pages; indexes only the few pending rows",
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON tweet_replies (tstp DESC, id DESC) WHERE {PENDING_PREDICATE}",
+            existing,
+            predicate=PENDING_PREDICATE,
+        )
+
+    return recommendations, skipped
+
+
+def loader_queries(start_date):
+    """Return (label, (statement, params)) for each loader query the dashboard runs."""
+    queries = []
+    for table in APPEND_ONLY_TABLES:
+        queries.append((f"load {table}", build_query(f"SELECT * FROM {table}", start_date, suffix="ORDER BY tstp DESC")))
+    for table in ("visit_logs", "qna_logs", "error_logs"):
+        queries.append((f"get_daily_stats({table})", _daily_stats_query(table, start_date)))
+        queries.append((f"get_hourly_stats({table})", _hourly_stats_query(table, start_date)))
+    queries += [
+        ("get_top_entrypoints", _top_entrypoints_query(10, start_date)),
+        ("load_poll_results", _poll_results_query(start_date)),
+        ("get_model_stats", _usage_stats_query("model_name", start_date)),
+        ("get_daily_cost_stats_grouped", _daily_cost_grouped_query(start_date)),
+        ("load_tweet_analysis", _tweet_analysis_query(start_date)),
+        ("get_tweet_stats", _tweet_stats_query(start_date)),
+        ("get_daily_tweet_stats", _daily_tweet_stats_query(start_date)),
+        ("get_top_authors", _top_authors_query(10, start_date)),
+        ("get_pending_tweet_replies", _pending_tweet_replies_query(100)),
+    ]
+    return queries
+
+
+def _scans(plan, found=None):
+    """List the scan nodes of an EXPLAIN JSON plan, e.g. 'Seq Scan on visit_logs'."""
+    found = found if found is not None else []
+    if "Relation Name" in plan:
+        scan = f"{plan['Node Type']} on {plan['Relation Name']}"
+        if "Index Name" in plan:
+            scan += f" using {plan['Index Name']}"
+        found.append(scan)
+    for child in plan.get("Plans", []):
+        _scans(child, found)
+    return found
+
+
+def explain(connection, statement, params):
+    """Run EXPLAIN (ANALYZE, BUFFERS) on a loader statement and summarize it."""
+    raw_plan = connection.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement.text}"), params
+    ).scalar()
+    result = (json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan)[0]
+    plan = result["Plan"]
+    return {
+        "execution_ms": result["Execution Time"],
+        "planning_ms": result["Planning Time"],
+        "rows": plan["Actual Rows"],
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "scans": _scans(plan),
+    }
+
+
+def apply_indexes(engine, recommendations):
+    """Create the missing indexes; CONCURRENTLY cannot run inside a transaction block."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        # Index builds on the log tables outlast the dashboard's statement timeout; the
+        # session setting is reset before the connection goes back to the pool
+        connection.execute(text("SET statement_timeout = 0"))
+        try:
+            invalid = connection.execute(
+                text(INVALID_INDEXES_SQL), {"names": [recommendation["name"] for recommendation in recommendations]}
+            ).scalars().all()
+            for name in invalid:
+                print(f"Dropping invalid index {name} ...")
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            for recommendation in recommendations:
+                print(f"Creating {recommendation['name']} ...")
+                connection.execute(text(recommendation["ddl"]))
+        finally:
+            connection.execute(text("RESET statement_timeout"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--explain", action="store_true", help="EXPLAIN (ANALYZE, BUFFERS) each loader query")
+    parser.add_argument("--days", type=int, default=7, help="Window for the explained queries (default: 7)")
+    parser.add_argument("--apply", action="store_true", help="Create the missing indexes")
+    args = parser.parse_args()
+
+    engine = get_db_connection()
+    with engine.connect() as connection:
+        recommendations, skipped = recommend_indexes(connection)
+
+    missing = [recommendation for recommendation in recommendations if not recommendation["present"]]
+    print(f"Indexes: {len(recommendations) - len(missing)} present, {len(missing)} missing")
+    for recommendation in recommendations:
+        status = "ok     " if recommendation["present"] else "MISSING"
+        print(f"  {status} {recommendation['table']:<20} {recommendation['name']:<36} {recommendation['reason']}")
+    for note in skipped:
+        print(f"  skipped {note}")
+    if missing:
+        print("\nDDL:")
+        for recommendation in missing:
+            print(f"  {recommendation['ddl']};")
+
+    if args.explain:
+        start_date = datetime.now() - timedelta(days=args.days)
+        print(f"\n{'query':<38} {'exec ms':>9} {'plan ms':>8} {'rows':>9} {'hit':>9} {'read':>9}  scans")
+        with engine.connect() as connection:
+            for label, (statement, params) in loader_queries(start_date):
+                try:
+                    summary = explain(connection, statement, params)
+                except Exception as e:
+                    connection.rollback()
+                    print(f"{label:<38} failed: {e}")
+                    continue
+                print(
+                    f"{label:<38} {summary['execution_ms']:>9.1f} {summary['planning_ms']:>8.1f} "
+                    f"{summary['rows']:>9,} {summary['shared_hit']:>9,} {summary['shared_read']:>9,}  "
+                    f"{'; '.join(summary['scans'])}"
+                )
+
+    if args.apply:
+        if missing:
+            apply_indexes(engine, missing)
+            print(f"Created {len(missing)} index(es)")
+        else:
+            print("Nothing to apply")
+
+
+if __name__ == "__main__":
+    main()
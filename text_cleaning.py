@@ -0,0 +1,40 @@
+"""Text normalization shared by tweet matching and thread detection.
+
+Post texts style paper titles with mathematical bold letters (e.g. "𝗧𝗿𝗮𝗰𝗸𝗶𝗻𝗴"), which
+NFKC folds back to plain ASCII, and carry t.co links that the stored reviews lack.
+normalize_text_column applies the whole pipeline to a column with pandas .str
+operations; clean_text is the same pipeline for a single string, so both sides of a
+comparison always agree.
+"""
+import re
+import unicodedata
+import pandas as pd
+
+_WHITESPACE = re.compile(r'\s+')
+# A t.co link and anything after it (the tweet's own link, appended by X)
+_TCO_TAIL = re.compile(r'https://t\.co/\w+.*$')
+_URL = re.compile(r'https?://\S+')
+
+def clean_text(text):
+    """NFKC-fold, collapse whitespace, and strip URLs from one string."""
+    text = unicodedata.normalize('NFKC', text).strip()
+    text = _WHITESPACE.sub(' ', text)
+    text = _TCO_TAIL.sub('', text)
+    text = _URL.sub('', text)
+    return text.strip()
+
+def normalize_text_column(texts):
+    """
+    Apply clean_text to a whole column with vectorized .str operations.
+
+    Missing values become empty strings.
+    """
+    texts = pd.Series(texts).fillna('').astype(str)
+    return (
+        texts.str.normalize('NFKC')
+        .str.strip()
+        .str.replace(_WHITESPACE, ' ', regex=True)
+        .str.replace(_TCO_TAIL, '', regex=True)
+        .str.replace(_URL, '', regex=True)
+        .str.strip()
+    )
@@ -3,6 +3,7 @@ import hmac
 from datetime import datetime, timedelta
 import time
 import pandas as pd
+from caching import canonical_window, get_cache_stats, get_data_as_of, reset_data_as_of
 
 def init_auth_sidebar():
     """Initialize the authentication sidebar with a subtle design."""
@@ -83,12 +84,30 @@ def display_refresh_controls(refresh_interval_seconds=30):
 
 def init_cache_controls():
     """Add a sidebar button to clear Streamlit caches and rerun."""
+    ## Loaders called from here on report their data age to display_data_as_of
+    reset_data_as_of()
     with st.sidebar:
         if st.button("🔄 Refresh Data Cache", type="secondary", use_container_width=True):
-            ## Clear both data and resource caches
+            ## Clear cached data only; the pooled engine and change listener in
+            ## st.cache_resource stay up (clearing them would orphan open connections)
             st.cache_data.clear()
-            st.cache_resource.clear()
-            st.rerun() 
+            st.rerun()
+
+        ## Per-loader cache effectiveness since the server started
+        with st.expander("📦 Cache Stats", expanded=False):
+            cache_stats = get_cache_stats()
+            if cache_stats:
+                stats_df = pd.DataFrame.from_dict(cache_stats, orient="index")
+                stats_df = stats_df[["calls", "hits", "misses", "hit_rate"]].sort_values("calls", ascending=False)
+                st.dataframe(stats_df.style.format({"hit_rate": "{:.0%}"}), use_container_width=True)
+            else:
+                st.caption("No cached loaders called yet.")
+
+def display_data_as_of():
+    """Caption with when the oldest data on the page was read or last confirmed unchanged."""
+    as_of = get_data_as_of()
+    if as_of is not None:
+        st.caption(f"🕒 Data as of {as_of.strftime('%b %d, %H:%M:%S')}")
 
 def format_cost(cost):
     """Format cost to display in dollars with sensible precision based on magnitude."""
@@ -161,7 +180,8 @@ def init_date_range_selector(
         custom_ranges (list): Custom list of predefined ranges
     
     Returns:
-        tuple: (start_date, end_date) as datetime objects or (None, None) for "All Time"
+        tuple: (start_date, end_date) as datetime objects or (None, None) for "All Time",
+            aligned with canonical_window so reruns reuse the same cache entries
     """
     # Default range options
     if custom_ranges is None:
@@ -260,4 +280,4 @@ def init_date_range_selector(
         # For predefined ranges, end_date is always now
         end_date = now if start_date else None
 
-    return start_date, end_date 
\ No newline at end of file
+    return canonical_window(start_date, end_date, now=now) 
\ No newline at end of file